@@ -0,0 +1,74 @@
+from src.Mod.Mod import Mod
+
+from PySide2 import QtCore
+from threading import Lock
+
+
+class ImageLoadTask(QtCore.QRunnable):
+    """
+    Runnable that loads a single mod's image on the image loader's thread pool.
+    """
+    def __init__(self, loader, mod: Mod, prefetch: bool):
+        """
+        :param loader: Image loader the task belongs to.
+        :param mod: Mod to load the image of.
+        :param prefetch: Whether to only prefetch the image, rather than load and emit it.
+        """
+        super(ImageLoadTask, self).__init__()
+        self.loader = loader
+        self.mod = mod
+        self.prefetch = prefetch
+
+    def run(self) -> None:
+        """
+        Executed when the task is ran by the thread pool.
+        """
+        self.loader.run_task(self.mod, self.prefetch)
+
+
+class ImageLoader(QtCore.QObject):
+    """
+    Loads mod images on a background thread pool, so the GUI thread never waits on disk or network access.
+    Loaded images are delivered through the image_loaded signal, which is handled on the GUI thread.
+    """
+    image_loaded = QtCore.Signal(str, object)
+
+    def __init__(self, parent, mod_manager, max_threads: int = 4):
+        """
+        :param parent: Parent Qt Object/Widget
+        :param mod_manager: Mod manager to load images through.
+        :param max_threads: Maximum amount of images to load at the same time.
+        """
+        super(ImageLoader, self).__init__(parent)
+        self.mod_manager = mod_manager
+        self.pool = QtCore.QThreadPool(self)
+        self.pool.setMaxThreadCount(max_threads)
+        self.pending = set()
+        self.lock = Lock()
+
+    def load(self, mod: Mod, prefetch: bool = False) -> None:
+        """
+        Start loading a mod's image. Does nothing if the same load is already pending.
+        :param mod: Mod to load the image of.
+        :param prefetch: Whether to only make sure the image is available locally, without emitting it.
+        """
+        with self.lock:
+            if (mod.id, prefetch) in self.pending:
+                return
+            self.pending.add((mod.id, prefetch))
+        self.pool.start(ImageLoadTask(self, mod, prefetch))
+
+    def run_task(self, mod: Mod, prefetch: bool) -> None:
+        """
+        Load a mod's image. Called from the thread pool.
+        :param mod: Mod to load the image of.
+        :param prefetch: Whether to only prefetch the image, rather than load and emit it.
+        """
+        try:
+            if prefetch:
+                self.mod_manager.prefetch_image(mod)
+            else:
+                self.image_loaded.emit(mod.id, self.mod_manager.get_image(mod))
+        finally:
+            with self.lock:
+                self.pending.discard((mod.id, prefetch))
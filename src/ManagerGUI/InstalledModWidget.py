@@ -20,6 +20,7 @@ class InstalledModWidget(QtWidgets.QFrame):
 
         self.update_button = None
         self.uninstall_button = None
+        self.job = None
 
         self.setToolTip(self.mod.display_name)
 
@@ -100,13 +101,18 @@ class InstalledModWidget(QtWidgets.QFrame):
         return text
 
     def uninstall_mod(self):
-        self.mod_manager.uninstall_mod(self.mod.id)
-        self.refresh_list()
+        """
+        Queue the mod for uninstallation on the mod manager's download queue, unless a job for it is queued already. The installed mod list refreshes itself once the mods directory has been rescanned.
+        """
+        if self.job is None or self.job.finished:
+            self.job = self.mod_manager.queue_uninstall(self.mod.id)
 
     def update_mod(self):
-        self.mod_manager.uninstall_mod(self.mod.id)
-        self.mod_manager.update_mod(self.mod.id, update_install=True)
-        self.refresh_list()
+        """
+        Queue the mod for an update on the mod manager's download queue, unless an update of it is queued already. The installed mod list refreshes itself once the mods directory has been rescanned.
+        """
+        if self.job is None or self.job.finished:
+            self.job = self.mod_manager.queue_update(self.mod.id)
 
     def refresh_list(self):
         self.parent().parent().refresh_list()
@@ -1,6 +1,9 @@
 from src.ManagerGUI.InstalledModWidget import InstalledModWidget
 from src.ManagerGUI.GenericThread import GenericThread
-from src.ModManager.ModManager import ModManager
+from src.ManagerGUI.ImageLoader import ImageLoader
+from src.ModManager.DownloadQueue import DownloadJob, JOB_RUNNING
+from src.ModManager.RefreshScheduler import REFRESH_DOWNLOADS, REFRESH_MODS
+from src.ModManager.ModManager import ModManager, INSTALL_STRATEGIES, INSTALL_COPY
 from src.ManagerGUI.ModWidget import ModWidget
 from src.Logger.Loggable import Loggable
 from src.Config.Config import Config
@@ -67,8 +70,10 @@ class ManagerGUI(Loggable, QtWidgets.QMainWindow):
     def closeEvent(self, QCloseEvent) -> None:
         """
         Called when the window closes.
-        Close all remaining popups when the window is closed.
+        Cancel any running mod fetch, stop watching the local directories and close all remaining popups when the window is closed.
         """
+        self.mod_manager.cancel_fetch()
+        self.mod_manager.stop_watching()
         for popup in self.popups:
             popup.close()
 
@@ -122,7 +127,7 @@ class ManagerTabWidget(QtWidgets.QTabWidget):
         #
         # self.addTab(self.save_manager_tab, "Save Manager")
 
-        self.settings_tab = SettingsTab(self, self.config)
+        self.settings_tab = SettingsTab(self, self.config, self.mod_manager)
 
         self.addTab(self.settings_tab, "Settings")
 
@@ -178,9 +183,10 @@ class SettingsTab(QtWidgets.QWidget):
     """
     A tab that holds settings-related widgets.
     """
-    def __init__(self, parent, config: Config):
+    def __init__(self, parent, config: Config, mod_manager: ModManager = None):
         super().__init__(parent)
         self.config = config
+        self.mod_manager = mod_manager
 
         self.settings_editor = None
 
@@ -190,7 +196,7 @@ class SettingsTab(QtWidgets.QWidget):
 
         layout = QtWidgets.QGridLayout(self)
 
-        self.settings_editor = SettingsEditor(self, config=self.config)
+        self.settings_editor = SettingsEditor(self, config=self.config, mod_manager=self.mod_manager)
         self.settings_menu = SettingsMenu(self, config=self.config)
 
         self.settings_editor.setMinimumSize(self.settings_editor.sizeHint())
@@ -206,9 +212,10 @@ class SettingsEditor(QtWidgets.QFrame):
     """
     Widget that handles editing of settings.
     """
-    def __init__(self,  parent, config: Config):
+    def __init__(self,  parent, config: Config, mod_manager: ModManager = None):
         super().__init__(parent)
         self.config = config
+        self.mod_manager = mod_manager
 
         self.setFrameStyle(QtCore.Qt.SolidLine)
 
@@ -219,6 +226,7 @@ class SettingsEditor(QtWidgets.QFrame):
         self.mods_dir_dialogue_button = None
         self.game_version_field = None
         self.repository_ids_list = None
+        self.install_strategy_field = None
 
         self.setup_widget()
 
@@ -254,13 +262,19 @@ class SettingsEditor(QtWidgets.QFrame):
         self.repository_ids_list.setToolTip("List of repositories to pull mods from. Do not touch if you don't know what you're doing. If in doubt, ask a Modder (or Max) on the official Discord.")
         self.repository_ids_list.setText(str(self.config.config.get("repository_ids", [])))
 
+        self.install_strategy_field = QtWidgets.QComboBox(self)
+        self.install_strategy_field.setToolTip("How mods are installed. Copy uses the most disk space. Hardlink shares files with the downloads. Symlink links the mod's folder to its download, so updating a download updates the installed mod too.")
+        self.install_strategy_field.addItems(INSTALL_STRATEGIES)
+        self.install_strategy_field.setCurrentText(self.config.config.get("install_strategy", INSTALL_COPY))
+
         layout = QtWidgets.QVBoxLayout()
 
         for field in [(self.github_access_token_field, 'Github Access Token:'),
                       (self.downloads_directory_field, 'Downloads Cache Directory:', self.downloads_dir_dialogue_button),
                       (self.mods_directory_field, 'Mods Directory:', self.mods_dir_dialogue_button),
                       (self.game_version_field, 'Game Version:'),
-                      (self.repository_ids_list, 'Repository IDs:')]:
+                      (self.repository_ids_list, 'Repository IDs:'),
+                      (self.install_strategy_field, 'Install Strategy:')]:
 
             subwidget_layout = QtWidgets.QHBoxLayout()
 
@@ -284,13 +298,21 @@ class SettingsEditor(QtWidgets.QFrame):
         self.setLayout(layout)
 
     def apply_settings(self):
+        previous_directories = (self.config.config.get("downloads_directory", ""), self.config.config.get("mods_directory", ""))
         self.config.config["github_access_token"] = self.github_access_token_field.text()
         self.config.config["downloads_directory"] = self.downloads_directory_field.text()
         self.config.config["mods_directory"] = self.mods_directory_field.text()
         self.config.config["repository_ids"] = literal_eval(self.repository_ids_list.text())
         self.config.config["game_version"] = self.game_version_field.text()
+        self.config.config["install_strategy"] = self.install_strategy_field.currentText()
         self.config.save_config()
 
+        # Watch and scan the new directories, so the mod lists follow them right away.
+        if self.mod_manager is not None and previous_directories != (self.config.config["downloads_directory"], self.config.config["mods_directory"]):
+            if self.config.config.get("watch_local_directories", True):
+                self.mod_manager.watch_local_directories()
+            self.mod_manager.refresh_scheduler.invalidate(REFRESH_DOWNLOADS, REFRESH_MODS)
+
 
 class SettingsMenu(QtWidgets.QFrame):
     """
@@ -353,9 +375,9 @@ class InstallationTab(QtWidgets.QWidget):
     def setup_widget(self):
         layout = QtWidgets.QGridLayout(self)
 
-        self.mod_display = ModDisplay(self)
+        self.mod_display = ModDisplay(self, mod_manager=self.mod_manager)
         self.mod_list = InstalledModListContainer(self, mod_manager=self.mod_manager)
-        self.installation_misc_menu = InstallMiscMenu(self, self.mod_manager.config)
+        self.installation_misc_menu = InstallMiscMenu(self, self.mod_manager.config, mod_manager=self.mod_manager)
 
         self.mod_display.setMinimumSize(self.mod_display.sizeHint())
         self.mod_list.setMinimumSize(self.mod_list.sizeHint())
@@ -387,7 +409,12 @@ class InstalledModListContainer(QtWidgets.QFrame):
 class InstalledModList(QtWidgets.QListWidget):
     """
     List that contains and represents installed mods.
+    The list is refreshed whenever the mod manager has rescanned the mods directory, which includes the scan of the local mods on startup.
+    Installations that change on disk are updated row by row.
     """
+    local_mod_changed = QtCore.Signal(str, bool, object)
+    directories_refreshed = QtCore.Signal(object)
+
     def __init__(self,  parent, mod_manager: ModManager):
         super().__init__(parent)
         self.setSizePolicy(QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.MinimumExpanding, QtWidgets.QSizePolicy.MinimumExpanding))
@@ -396,6 +423,10 @@ class InstalledModList(QtWidgets.QListWidget):
         self.installation_tab = self.parent().parent()
 
         self.currentItemChanged.connect(self.current_item_changed)
+        self.local_mod_changed.connect(self.update_mod)
+        self.mod_manager.add_local_listener(self.local_mod_changed.emit)
+        self.directories_refreshed.connect(self.refreshed)
+        self.mod_manager.refresh_scheduler.add_listener(self.directories_refreshed.emit)
 
         self.refresh_list()
 
@@ -423,6 +454,35 @@ class InstalledModList(QtWidgets.QListWidget):
         self.addItem(item)
         self.setItemWidget(item, mod_widget)
 
+    def update_mod(self, mod_id: str, installed: bool, mod: Mod) -> None:
+        """
+        Update, add or remove the row of a single installed mod that changed on disk.
+        :param mod_id: Mod id of the mod that changed.
+        :param installed: Whether or not the change was to an installed mod. Changes to downloads are ignored.
+        :param mod: The mod, or None if it was uninstalled.
+        """
+        if not installed:
+            return
+        for row in range(self.count()):
+            if self.itemWidget(self.item(row)).mod.id == mod_id:
+                if mod is None:
+                    self.takeItem(row)
+                else:
+                    mod_widget = InstalledModWidget(mod=mod, mod_manager=self.mod_manager)
+                    self.item(row).setSizeHint(mod_widget.sizeHint())
+                    self.setItemWidget(self.item(row), mod_widget)
+                return
+        if mod is not None:
+            self.add_item(mod)
+
+    def refreshed(self, directory_names: set) -> None:
+        """
+        Refresh the list once the mod manager has rescanned the mods directory, on startup or after a job changed it.
+        :param directory_names: Names of the directories that were rescanned.
+        """
+        if REFRESH_MODS in directory_names:
+            self.refresh_list()
+
     def fill_list(self, mods: list[Mod]) -> None:
         """
         Fills the mod list with mods.
@@ -435,6 +495,7 @@ class InstalledModList(QtWidgets.QListWidget):
     def refresh_list(self, refresh: bool = False) -> None:
         """
         Refresh the list.
+        :param refresh: Whether or not to rescan the mods directory as well. The rescan runs in the background, and refreshes the list again once it is done.
         """
         self.fill_list(self.mod_manager.get_installed_mods(refresh=refresh))
 
@@ -443,10 +504,11 @@ class InstallMiscMenu(QtWidgets.QFrame):
     """
     Misc menu widget with buttons related to the installation tab.
     """
-    def __init__(self, parent=None, config=None):
+    def __init__(self, parent=None, config=None, mod_manager: ModManager = None):
         super().__init__(parent)
         self.setFrameStyle(QtCore.Qt.SolidLine)
         self.config = config
+        self.mod_manager = mod_manager
 
         self.main_window = self.parent().parent().parent()
 
@@ -465,14 +527,20 @@ class InstallMiscMenu(QtWidgets.QFrame):
         about_button = QtWidgets.QPushButton(self)
         about_button.setText("About")
 
+        update_all_button = QtWidgets.QPushButton(self)
+        update_all_button.setText("Update all")
+        update_all_button.setToolTip("Update every installed mod that has an update available.")
+
         label = UMMLabel(self, self.config)
 
         refresh_button.clicked.connect(lambda: self.parent().mod_list.list.refresh_list(refresh=True))
         about_button.clicked.connect(lambda: self.main_window.popup(ABOUT_TEXT))
+        update_all_button.clicked.connect(lambda: self.mod_manager.queue_update_all())
 
         layout.addWidget(refresh_button, 0, 0)
         layout.addWidget(about_button, 0, 1)
-        layout.addWidget(label, 1, 0, 1, 2)
+        layout.addWidget(update_all_button, 1, 0, 1, 2)
+        layout.addWidget(label, 2, 0, 1, 2)
 
         self.setLayout(layout)
 
@@ -491,15 +559,17 @@ class DownloadTab(QtWidgets.QWidget):
         self.mod_display = None
         self.mod_list = None
         self.misc_menu = None
+        self.download_queue_view = None
 
         self.setup_widget()
 
     def setup_widget(self) -> None:
         layout = QtWidgets.QGridLayout(self)
 
-        self.mod_display = ModDisplay(self)
+        self.mod_display = ModDisplay(self, mod_manager=self.mod_manager)
         self.mod_list = ModListContainer(self, mod_manager=self.mod_manager)
-        self.misc_menu = MiscMenu(self, config=self.mod_manager.config)
+        self.misc_menu = MiscMenu(self, config=self.mod_manager.config, mod_manager=self.mod_manager)
+        self.download_queue_view = DownloadQueueView(self, mod_manager=self.mod_manager)
 
         self.mod_display.setMinimumSize(self.mod_display.sizeHint())
         self.mod_list.setMinimumSize(self.mod_list.sizeHint())
@@ -507,7 +577,8 @@ class DownloadTab(QtWidgets.QWidget):
 
         layout.addWidget(self.mod_list, 0, 0, 5, 1)
         layout.addWidget(self.misc_menu, 5, 0, 1, 1)
-        layout.addWidget(self.mod_display, 0, 1, 6, 1)
+        layout.addWidget(self.mod_display, 0, 1, 4, 1)
+        layout.addWidget(self.download_queue_view, 4, 1, 2, 1)
 
         self.setLayout(layout)
 
@@ -578,14 +649,19 @@ class ModInfo(QtWidgets.QTextEdit):
 class ModDisplay(QtWidgets.QFrame):
     """
     Framed widget that contains widgets that display information on the selected mod.
+    The selected mod's image is loaded in the background; the placeholder is shown until it is ready.
     """
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, mod_manager: ModManager = None):
         super().__init__(parent)
         self.setSizePolicy(QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.MinimumExpanding, QtWidgets.QSizePolicy.MinimumExpanding))
         self.setFrameStyle(QtCore.Qt.SolidLine)
 
         self.mod_image = None
         self.mod_info = None
+        self.displayed_mod_id = None
+
+        self.image_loader = ImageLoader(self, mod_manager)
+        self.image_loader.image_loaded.connect(self.image_loaded)
 
         self.setup_widget()
 
@@ -610,14 +686,28 @@ class ModDisplay(QtWidgets.QFrame):
     def update_display(self, mod: ModWidget) -> None:
         """
         Update the Mod Display Image & Info widgets with information from the provided mod widget.
+        The image is set to the placeholder until the mod's image has been loaded.
         :param mod: The mod to display.
         """
+        self.displayed_mod_id = mod.mod.id
+        self.mod_image.set_placeholder()
+        self.mod_info.set_text(mod.get_display_text())
+        self.image_loader.load(mod.mod)
+
+    def image_loaded(self, mod_id: str, image) -> None:
+        """
+        Called when the image loader has loaded a mod's image.
+        Ignored if a different mod was selected in the meantime.
+        :param mod_id: Mod id of the mod the image belongs to.
+        :param image: The raw bytes of the image, or None if it could not be loaded.
+        """
+        if mod_id != self.displayed_mod_id:
+            return
         try:
-            self.mod_image.set_image(mod.mod.image)
+            self.mod_image.set_image(image)
         except Exception as e:
             # TODO: Log error
             self.mod_image.set_placeholder()
-        self.mod_info.set_text(mod.get_display_text())
 
 
 class ModListContainer(QtWidgets.QFrame):
@@ -709,7 +799,13 @@ class ModListSearchButton(QtWidgets.QPushButton):
 class ModList(QtWidgets.QListWidget):
     """
     List that contains and represents mods available in the configured central mod repositories.
+    Mods are inserted into the list one by one while they are being fetched, and downloads that change on disk are updated row by row.
     """
+    mod_fetched = QtCore.Signal(object)
+    job_changed = QtCore.Signal(object)
+    local_mod_changed = QtCore.Signal(str, bool, object)
+    directories_refreshed = QtCore.Signal(object)
+
     def __init__(self,  parent, mod_manager: ModManager):
         super().__init__(parent)
         self.setSizePolicy(QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.MinimumExpanding, QtWidgets.QSizePolicy.MinimumExpanding))
@@ -722,10 +818,20 @@ class ModList(QtWidgets.QListWidget):
         self.refresh_icon = None
 
         self.refetcher_thread.finished.connect(self.thread_finished)
+        self.mod_fetched.connect(self.add_or_update_mod)
+        self.job_changed.connect(self.show_job)
+        self.mod_manager.download_queue.add_listener(self.job_changed.emit)
+        self.local_mod_changed.connect(self.update_local_mod)
+        self.mod_manager.add_local_listener(self.local_mod_changed.emit)
+        self.directories_refreshed.connect(self.refreshed)
+        self.mod_manager.refresh_scheduler.add_listener(self.directories_refreshed.emit)
         self.currentItemChanged.connect(self.current_item_changed)
+        self.verticalScrollBar().valueChanged.connect(self.prefetch_visible_images)
 
         self.setup_widget()
 
+        # Show the mods from the last session's catalog right away; the refetch will update them.
+        self.refresh_list()
         self.threaded_refetch_list()
 
     def setup_widget(self):
@@ -752,8 +858,9 @@ class ModList(QtWidgets.QListWidget):
     def refetch_list(self) -> None:
         """
         Refetch the mod list.
+        Every fetched mod is passed to the GUI thread through the mod_fetched signal.
         """
-        self.rate_limited = not self.mod_manager.fetch_info()
+        self.rate_limited = not self.mod_manager.fetch_info(on_mod=self.mod_fetched.emit)
 
     def threaded_refetch_list(self) -> None:
         """
@@ -781,17 +888,72 @@ class ModList(QtWidgets.QListWidget):
         """
         self.clear()
 
-    def add_item(self, mod: Mod) -> None:
+    def add_item(self, mod: Mod, row: int = None) -> None:
         """
         Adds an item to the list, and then sets that item to display the given ModEntry widget.
         :param mod: The mod to list.
+        :param row: Row to insert the item at. Appended to the end of the list if not given.
         """
         item = QtWidgets.QListWidgetItem()
         mod_widget = ModWidget(mod=mod, parent=self, mod_manager=self.mod_manager)
         item.setSizeHint(mod_widget.sizeHint())
-        self.addItem(item)
+        if row is None:
+            self.addItem(item)
+        else:
+            self.insertItem(row, item)
         self.setItemWidget(item, mod_widget)
 
+    def add_or_update_mod(self, mod: Mod) -> None:
+        """
+        Add a single mod to the list, or update its row if it is listed already.
+        New rows are inserted at their sorted position. Mods that don't pass the current filters are ignored.
+        :param mod: The mod to add or update.
+        """
+        if len(self.mod_manager.apply_filter_search(self.mod_manager.apply_filter_tags([mod]))) == 0:
+            return
+
+        insert_row = self.count()
+        for row in range(self.count()):
+            listed_mod = self.itemWidget(self.item(row)).mod
+            if listed_mod.id == mod.id:
+                mod_widget = ModWidget(mod=mod, parent=self, mod_manager=self.mod_manager)
+                self.item(row).setSizeHint(mod_widget.sizeHint())
+                self.setItemWidget(self.item(row), mod_widget)
+                return
+            if insert_row == self.count() and listed_mod.display_name > mod.display_name:
+                insert_row = row
+
+        self.add_item(mod, row=insert_row)
+        self.prefetch_visible_images()
+
+    def update_local_mod(self, mod_id: str, installed: bool, mod: Mod) -> None:
+        """
+        Update the row of a single mod whose download changed on disk, or remove it if the mod is no longer available at all.
+        :param mod_id: Mod id of the mod that changed.
+        :param installed: Whether or not the change was to an installed mod. Changes to installations are ignored.
+        :param mod: The mod, or None if it was removed.
+        """
+        if installed:
+            return
+        if mod is not None:
+            self.add_or_update_mod(mod)
+            return
+        for row in range(self.count()):
+            if self.itemWidget(self.item(row)).mod.id == mod_id:
+                self.takeItem(row)
+                return
+
+    def show_job(self, job: DownloadJob) -> None:
+        """
+        Show a download queue job's state on the row of the mod it is for.
+        :param job: The job that changed.
+        """
+        for row in range(self.count()):
+            mod_widget = self.itemWidget(self.item(row))
+            if mod_widget.mod.id == job.mod_id:
+                mod_widget.job_changed(job)
+                return
+
     def fill_list(self, mods: list[Mod]) -> None:
         """
         Fills the mod list with mods.
@@ -801,11 +963,34 @@ class ModList(QtWidgets.QListWidget):
         for mod in mods:
             self.add_item(mod)
 
+    def refreshed(self, directory_names: set) -> None:
+        """
+        Refresh the list once the mod manager has rescanned the downloads directory, so it shows which mods are downloaded.
+        :param directory_names: Names of the directories that were rescanned.
+        """
+        if REFRESH_DOWNLOADS in directory_names:
+            self.refresh_list()
+
     def refresh_list(self) -> None:
         """
         Refresh the mod list without refetching all entries.
         """
         self.fill_list(self.mod_manager.get_mods())
+        self.prefetch_visible_images()
+
+    def prefetch_visible_images(self) -> None:
+        """
+        Prefetch the images of the mods that are scrolled into view, so they are ready by the time one is selected.
+        """
+        if self.count() == 0:
+            return
+        viewport_rect = self.viewport().rect()
+        first_row = max(self.indexAt(viewport_rect.topLeft()).row(), 0)
+        last_row = self.indexAt(viewport_rect.bottomLeft()).row()
+        if last_row < 0:
+            last_row = self.count() - 1
+        for row in range(first_row, last_row + 1):
+            self.download_tab.mod_display.image_loader.load(self.itemWidget(self.item(row)).mod, prefetch=True)
 
     def refresh_installed_list(self) -> None:
         """
@@ -819,10 +1004,11 @@ class MiscMenu(QtWidgets.QFrame):
     """
     Misc menu widget with buttons related to the downloads tab.
     """
-    def __init__(self, parent=None, config=None):
+    def __init__(self, parent=None, config=None, mod_manager: ModManager = None):
         super().__init__(parent)
         self.setFrameStyle(QtCore.Qt.SolidLine)
         self.config = config
+        self.mod_manager = mod_manager
 
         self.main_window = self.parent().parent().parent()
 
@@ -841,17 +1027,143 @@ class MiscMenu(QtWidgets.QFrame):
         about_button = QtWidgets.QPushButton(self)
         about_button.setText("About")
 
+        download_all_button = QtWidgets.QPushButton(self)
+        download_all_button.setText("Download all")
+        download_all_button.setToolTip("Download every listed mod at once, from the mod repositories' archives.")
+
         label = UMMLabel(self, self.config)
+        rate_limit_label = RateLimitLabel(self, self.mod_manager)
 
         discord_button.clicked.connect(lambda: self.main_window.popup("""<a href=\"https://discord.gg/msuBMFrpYg\">https://discord.gg/msuBMFrpYg</a>"""))
         about_button.clicked.connect(lambda: self.main_window.popup(ABOUT_TEXT))
+        download_all_button.clicked.connect(lambda: self.mod_manager.queue_archive_download())
 
         layout.addWidget(discord_button, 0, 0)
         layout.addWidget(about_button, 0, 1)
-        layout.addWidget(label, 1, 0, 1, 2)
+        layout.addWidget(download_all_button, 1, 0, 1, 2)
+        layout.addWidget(label, 2, 0, 1, 2)
+        layout.addWidget(rate_limit_label, 3, 0, 1, 2)
+
+        self.setLayout(layout)
+
+
+# Download Queue
+
+
+class DownloadQueueView(QtWidgets.QFrame):
+    """
+    Shows the jobs in the mod manager's download queue, and allows cancelling them.
+    """
+    job_changed = QtCore.Signal(object)
+
+    def __init__(self, parent, mod_manager: ModManager):
+        super().__init__(parent)
+        self.setFrameStyle(QtCore.Qt.SolidLine)
+        self.mod_manager = mod_manager
+
+        self.job_list = None
+        self.rows: dict[int, tuple] = dict()
+
+        self.setup_widget()
+
+        self.job_changed.connect(self.show_job)
+        self.mod_manager.download_queue.add_listener(self.job_changed.emit)
+
+    def setup_widget(self) -> None:
+        layout = QtWidgets.QVBoxLayout()
+
+        self.job_list = QtWidgets.QListWidget(self)
+
+        clear_button = QtWidgets.QPushButton(self)
+        clear_button.setText("Clear finished")
+        clear_button.clicked.connect(self.clear_finished)
+
+        layout.addWidget(QtWidgets.QLabel("Downloads", self))
+        layout.addWidget(self.job_list, stretch=1)
+        layout.addWidget(clear_button)
 
         self.setLayout(layout)
 
+    def show_job(self, job: DownloadJob) -> None:
+        """
+        Add a row for a job, or update its row if it is listed already.
+        :param job: The job that changed.
+        """
+        if job.id not in self.rows:
+            row = QtWidgets.QWidget(self.job_list)
+            row_layout = QtWidgets.QHBoxLayout()
+            label = QtWidgets.QLabel(row)
+            cancel_button = QtWidgets.QPushButton(row)
+            cancel_button.setText("Cancel")
+            cancel_button.clicked.connect(lambda: self.mod_manager.cancel_job(job.id))
+            row_layout.addWidget(label, stretch=1)
+            row_layout.addWidget(cancel_button)
+            row.setLayout(row_layout)
+
+            item = QtWidgets.QListWidgetItem()
+            item.setSizeHint(row.sizeHint())
+            self.job_list.addItem(item)
+            self.job_list.setItemWidget(item, row)
+            self.rows[job.id] = (item, label, cancel_button)
+
+        item, label, cancel_button = self.rows[job.id]
+        text = f"{job.kind.capitalize()} {job.mod_id}: {job.status}"
+        if job.status == JOB_RUNNING and job.bytes_total > 0:
+            text += f" ({job.percentage}%)"
+        label.setText(text)
+        cancel_button.setDisabled(job.finished)
+
+    def clear_finished(self) -> None:
+        """
+        Remove finished jobs from the queue and from the list.
+        """
+        self.mod_manager.download_queue.clear_finished()
+        remaining = [job.id for job in self.mod_manager.download_queue.get_jobs()]
+        for job_id in [job_id for job_id in self.rows if job_id not in remaining]:
+            item = self.rows.pop(job_id)[0]
+            self.job_list.takeItem(self.job_list.row(item))
+
+
+# Rate Limit Label
+
+
+class RateLimitLabel(QtWidgets.QLabel):
+    """
+    Label that shows the remaining Github API budget, and how long queued requests are expected to take.
+    """
+    def __init__(self, parent, mod_manager: ModManager):
+        super().__init__(parent)
+        self.mod_manager = mod_manager
+
+        self.setAlignment(QtCore.Qt.AlignCenter)
+        self.setStyleSheet("QLabel {color: #808080}")
+
+        self.timer = QtCore.QTimer(self)
+        self.timer.timeout.connect(self.refresh_rate_limit_label)
+        self.timer.start(1000)
+
+        self.refresh_rate_limit_label()
+
+    def refresh_rate_limit_label(self) -> None:
+        """
+        Refresh the label's text from the mod manager's rate limit status.
+        """
+        status = self.mod_manager.get_rate_limit_status()
+        text = ""
+
+        if status["remaining"] is not None and status["limit"]:
+            text += f"Github API budget: {status['remaining']}/{status['limit']}"
+            if status["remaining"] == 0 and status["reset_time"]:
+                text += f" (paused until {QtCore.QDateTime.fromSecsSinceEpoch(int(status['reset_time'])).toString('HH:mm:ss')})"
+
+        if status["estimated_completion"] is not None:
+            seconds_left = max(int(status["estimated_completion"] - QtCore.QDateTime.currentSecsSinceEpoch()), 0)
+            if text:
+                text += " | "
+            text += f"{status['pending']} requests queued, ~{seconds_left}s left"
+
+        self.setText(text)
+
 
 # UMM Check Label
 
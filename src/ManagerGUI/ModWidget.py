@@ -1,9 +1,13 @@
-from src.ManagerGUI.GenericThread import GenericThread
+from src.ModManager.DownloadQueue import DownloadJob, JOB_QUEUED
 from src.Mod.Mod import Mod
 
 from PySide2 import QtCore, QtWidgets, QtGui
 
 
+# What the buttons say while a job of each kind runs.
+JOB_VERBS = {"update": "Updating", "uninstall": "Uninstalling"}
+
+
 class ModWidget(QtWidgets.QFrame):
     """
     Framed widget that holds and displays a Mod's info for use in Qt's list widget.
@@ -15,15 +19,13 @@ class ModWidget(QtWidgets.QFrame):
         self.mod = mod
         self.mod_manager = mod_manager
 
-        self.downloader_thread = GenericThread(self, lambda: self.mod_manager.download_mod(self.mod.id))
-        self.updater_thread = GenericThread(self, lambda: self.mod_manager.update_mod(self.mod.id))
-
         self.download_button = None
         self.update_button = None
         self.install_button = None
         self.warning_icon = None
 
         self.rows = []
+        self.job = None
 
         self.setToolTip(self.mod.display_name)
 
@@ -40,9 +42,6 @@ class ModWidget(QtWidgets.QFrame):
 
         layout = QtWidgets.QVBoxLayout()
 
-        self.downloader_thread.finished.connect(self.thread_finished)
-        self.updater_thread.finished.connect(self.thread_finished)
-
         self.download_button = QtWidgets.QPushButton(self)
         self.download_button.setText("Download")
         self.download_button.clicked.connect(lambda: self.threaded_download())
@@ -67,6 +66,9 @@ class ModWidget(QtWidgets.QFrame):
 
         name_label = QtWidgets.QLabel(self)
         name_label.setText(self.mod.display_name)
+        if self.mod.stale:
+            name_label.setStyleSheet("QLabel {color: #808080}")
+            name_label.setToolTip("Cached from a previous session. Will be updated once the mod list has been refreshed.")
         self.warning_icon.setMaximumHeight(name_label.height())
         self.warning_icon.setPixmap(self.warning_icon.pixmap().scaled(self.warning_icon.width(), self.warning_icon.height(), QtCore.Qt.KeepAspectRatio, QtGui.Qt.SmoothTransformation))
         self.warning_icon.setAlignment(QtCore.Qt.AlignRight)
@@ -123,6 +125,8 @@ class ModWidget(QtWidgets.QFrame):
         self.setLayout(layout)
 
     def refresh_buttons(self):
+        self.download_button.setText("Download")
+        self.update_button.setText("Update")
         if self.mod.downloaded_dir_path is None:
             self.update_button.hide()
             self.install_button.hide()
@@ -196,21 +200,42 @@ class ModWidget(QtWidgets.QFrame):
 
     def threaded_download(self):
         """
-        Download the mod using the downloader thread, preventing it from blocking the main thread.
+        Queue the mod for download on the mod manager's download queue, preventing it from blocking the main thread.
         """
-        if not self.downloader_thread.isRunning():
-            self.downloader_thread.start()
+        if self.job is None or self.job.finished:
+            self.job = self.mod_manager.queue_download(self.mod.id)
 
     def threaded_update(self):
         """
-        Update the mod using the updater thread, preventing it from blocking the main thread.
+        Queue the mod for an update on the mod manager's download queue, preventing it from blocking the main thread.
         """
-        if not self.updater_thread.isRunning():
-            self.updater_thread.start()
+        if self.job is None or self.job.finished:
+            self.job = self.mod_manager.queue_update(self.mod.id)
 
-    def thread_finished(self):
+    def job_changed(self, job: DownloadJob) -> None:
         """
-        Called when the downloader thread is finished.
+        Show the state of a download queue job for this mod.
+        :param job: The job that changed.
+        """
+        self.job = job
+        if job.finished:
+            self.job_finished()
+        elif job.status == JOB_QUEUED:
+            self.show_status("Queued...")
+        else:
+            self.show_status(f"{JOB_VERBS.get(job.kind, 'Downloading')}... {job.percentage}%")
+
+    def show_status(self, text: str) -> None:
+        """
+        Show the state of the mod's download on its buttons.
+        :param text: Text to show.
+        """
+        self.download_button.setText(text)
+        self.update_button.setText(text)
+
+    def job_finished(self):
+        """
+        Called when the mod's download queue job is finished.
         """
         new_mod = self.mod_manager.get_mod(self.mod.id)
         self.mod = new_mod or self.mod
@@ -220,5 +245,9 @@ class ModWidget(QtWidgets.QFrame):
         self.context_menu.popup(QtGui.QCursor.pos())
 
     def install_mod(self):
-        self.mod_manager.install_mod(self.mod.id)
-        self.parent().parent().refresh_installed_list()
+        """
+        Queue the mod for installation on the mod manager's download queue, together with its missing requirements.
+        The installed mod list refreshes itself once the mods directory has been rescanned.
+        """
+        if self.job is None or self.job.finished:
+            self.job = self.mod_manager.queue_install(self.mod.id)
@@ -1,9 +1,79 @@
+from src.Network.RequestScheduler import RequestScheduler, RequestCancelled, PRIORITY_DOWNLOAD
+from src.Network.HttpTransport import HttpTransport
+from src.Storage.DirectoryCleaner import DirectoryCleaner, OLD_DIRECTORY_MARKER
+from src.Storage.FileStore import FileStore, git_blob_sha_file
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
-from ast import literal_eval
-from os.path import exists
-from shutil import rmtree
-from os import mkdir
-import requests
+from threading import Lock, Event
+from time import time_ns
+from os.path import exists, getsize, join, split
+from os import makedirs, replace, remove, link, scandir
+from shutil import rmtree, copy2
+import json
+
+
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+STAGING_DIRECTORY = ".staging/"
+MANIFEST_FILE = ".manifest.json"
+
+
+def read_manifest(directory: str) -> dict:
+    """
+    Read the manifest of a downloaded or installed mod directory.
+    :param directory: Mod directory to read the manifest of.
+    :return: Dictionary of file name to {"sha", "size"}. Empty if the directory has no (readable) manifest.
+    """
+    manifest_path = join(directory, MANIFEST_FILE)
+    if not exists(manifest_path):
+        return dict()
+    try:
+        with open(manifest_path, 'r') as manifest_file:
+            return json.loads(manifest_file.read()).get("files", dict())
+    except Exception:
+        return dict()
+
+
+def write_manifest(directory: str, files: dict) -> None:
+    """
+    Write the manifest of a mod directory.
+    :param directory: Mod directory to write the manifest to.
+    :param files: Dictionary of file name to {"sha", "size"}.
+    """
+    # Written to a new file rather than in place, since an installed mod's manifest may be hard linked to its download's.
+    manifest_path = join(directory, MANIFEST_FILE)
+    with open(manifest_path + ".tmp", 'w') as manifest_file:
+        manifest_file.write(json.dumps({"files": files}))
+    replace(manifest_path + ".tmp", manifest_path)
+
+
+def swap_directory(new_path: str, target_path: str, cleaner: DirectoryCleaner = None, old_directory: str = None) -> None:
+    """
+    Replace a directory with another one, using two renames.
+    The old directory is moved aside rather than deleted first, so it is restored if the new one can't be moved into place.
+    Deleting the old directory is left to the cleaner if one is given, so the target is only missing for the moment between both renames.
+    :param new_path: Directory to move into place.
+    :param target_path: Directory to replace.
+    :param cleaner: Optional directory cleaner to delete the old directory in the background. It is deleted right away otherwise.
+    :param old_directory: Directory to move the old directory into. Defaults to the target's parent directory. Must be on the same volume.
+    """
+    new_path = new_path.rstrip("/")
+    target_path = target_path.rstrip("/")
+    parent_path, target_name = split(target_path)
+    old_path = join(old_directory or parent_path, f".{target_name}{OLD_DIRECTORY_MARKER}-{time_ns()}")
+
+    if exists(target_path):
+        replace(target_path, old_path)
+    try:
+        replace(new_path, target_path)
+    except Exception:
+        if exists(old_path):
+            replace(old_path, target_path)
+        raise
+    if exists(old_path):
+        if cleaner is not None:
+            cleaner.schedule(old_path)
+        else:
+            rmtree(old_path)
 
 
 @dataclass
@@ -24,43 +94,170 @@ class Mod:
     download_url: str = None
     home_page: str = None
     repository: str = None
-    image: bytes = None
+    image_key: str = None
+    image_url: str = None
+    image_path: str = None
     modloader_required: bool = False
     additional_fields: dict = field(default_factory=dict)
     downloaded_dir_path: str = None
     installed_dir_path: str = None
     update_available: bool = False
     compatible_game_version: bool = False
+    stale: bool = False
 
-    def download(self, path: str = "./data/downloads/") -> bool:
+    def download(self, path: str = "./data/downloads/", transport: HttpTransport = None, max_workers: int = 4, progress=None, cancel_event: Event = None, file_store: FileStore = None, stats: dict = None, cleaner: DirectoryCleaner = None, scheduler: RequestScheduler = None) -> bool:
         """
         Downloads mod to provided path directory.
+        Files are downloaded concurrently, and streamed to disk in fixed-size chunks so memory use doesn't grow with file size.
+        Files are first downloaded into a staging directory, which only replaces the existing mod directory once every file has finished.
+        Partial files are kept in the staging directory when a download fails or is cancelled, and resumed with a Range request on the next attempt.
+        Files whose blob SHA matches the manifest of the previous download (or a file in the file store) are linked instead of downloaded again, so updates only transfer changed files. Reused and resumed files are checked against their blob SHA first.
         :param path: Directory to download to.
+        :param transport: HTTP transport to download over. A new one is created if none is given.
+        :param max_workers: Maximum amount of files to download at the same time.
+        :param progress: Optional function that is called with (bytes done, bytes total) whenever a chunk has been written. Called from the download threads.
+        :param cancel_event: Optional event that cancels the download when set.
+        :param file_store: Optional file store to add the downloaded files to, and to reuse files from.
+        :param stats: Optional dictionary that is filled with the amount of bytes "downloaded" and "reused".
+        :param cleaner: Optional directory cleaner to delete the previous download in the background.
+        :param scheduler: Optional request scheduler to send the requests through, so they wait for the rate limit instead of failing. They are sent over the transport directly otherwise.
         :return: Whether or not the download was successful.
+        :raises RequestCancelled: If the download was cancelled.
         """
-        parsed_url = literal_eval(requests.get(self.download_url).content.decode("utf-8"))
+        transport = transport or HttpTransport(None)
+
+        def get(url: str, headers: dict = None, stream: bool = False):
+            if scheduler is not None:
+                return scheduler.get(url, headers=headers, stream=stream, priority=PRIORITY_DOWNLOAD)
+            return transport.get(url, headers=headers, stream=stream)
+
+        response = get(self.download_url)
+        response.raise_for_status()
+        parsed_url = [file for file in json.loads(response.content.decode("utf-8")) if file.get("type", "file") == "file"]
         if len(parsed_url) == 0:
             return False
 
         if path in [None, ""]:
             return False
 
-        if not exists(path):
-            mkdir(path)
-
         remote_folder_name = parsed_url[0]['path'].split("/")[1]
 
         full_path = path + remote_folder_name + "/"
+        staging_path = path + STAGING_DIRECTORY + remote_folder_name + "/"
+        makedirs(staging_path, exist_ok=True)
+
+        previous_manifest = read_manifest(full_path)
+
+        bytes_total = sum(file.get('size', 0) for file in parsed_url)
+        bytes_done = [0]
+        bytes_reused = [0]
+        progress_lock = Lock()
+
+        def part_path(file: dict) -> str:
+            # Partial files are named after their blob SHA, so a partial file of an older version is never resumed.
+            return f"{staging_path}{file['name']}.{file.get('sha', '')}.part"
+
+        def add_progress(amount: int) -> None:
+            with progress_lock:
+                bytes_done[0] += amount
+                if progress is not None:
+                    progress(bytes_done[0], bytes_total)
+
+        def matches_sha(file_path: str, file: dict) -> bool:
+            sha = file.get('sha', None)
+            if sha in [None, ""]:
+                return True
+            if file_store is not None:
+                return file_store.verify_file(file_path, sha)
+            return git_blob_sha_file(file_path) == sha
+
+        def reuse_file(file: dict, file_path: str) -> bool:
+            # Reused files are verified first, since downloads share their files with hard linked installations that may have changed them in place.
+            sha = file.get('sha', None)
+            if sha in [None, ""]:
+                return False
+            # Linked next to the partial file first, so the partial file is kept if nothing can be reused.
+            link_path = file_path + ".link"
+            if exists(link_path):
+                remove(link_path)
+            previous_path = full_path + file['name']
+            if file_store is not None and file_store.link_stored(sha, link_path):
+                pass
+            elif previous_manifest.get(file['name'], dict()).get('sha', None) == sha and exists(previous_path) and matches_sha(previous_path, file):
+                try:
+                    link(previous_path, link_path)
+                except OSError:
+                    copy2(previous_path, link_path)
+            else:
+                return False
+            replace(link_path, file_path)
+            return True
+
+        def download_file(file: dict) -> None:
+            file_path = part_path(file)
+            file_size = file.get('size', 0)
+
+            if reuse_file(file, file_path):
+                with progress_lock:
+                    bytes_reused[0] += file_size
+                add_progress(file_size)
+                return
 
-        # Delete mod directory if it already exists, to prevent keeping outdated / removed files.
-        if exists(full_path):
-            rmtree(full_path)
-        mkdir(full_path)
+            offset = getsize(file_path) if exists(file_path) else 0
+            if offset > file_size > 0:
+                remove(file_path)
+                offset = 0
+            if 0 < file_size <= offset:
+                if matches_sha(file_path, file):
+                    add_progress(offset)
+                    return
+                remove(file_path)
+                offset = 0
+
+            headers = {"Range": f"bytes={offset}-"} if offset > 0 else None
+            with get(file['download_url'], headers=headers, stream=True) as file_response:
+                file_response.raise_for_status()
+                # Servers that ignore the Range header send the whole file again.
+                if offset > 0 and file_response.status_code != 206:
+                    offset = 0
+                add_progress(offset)
+                with open(file_path, 'ab' if offset > 0 else 'wb') as file_to_save:
+                    for chunk in file_response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                        if cancel_event is not None and cancel_event.is_set():
+                            raise RequestCancelled(f"Download of mod \"{self.id}\" was cancelled.")
+                        file_to_save.write(chunk)
+                        add_progress(len(chunk))
+
+            # A resumed file is only as good as the partial file it was resumed from, so it is checked before it is added to the file store.
+            if offset > 0 and not matches_sha(file_path, file):
+                add_progress(-getsize(file_path))
+                remove(file_path)
+                download_file(file)
+
+        with ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix=f"Download-{self.id}") as executor:
+            # Consuming the results re-raises the first exception of a failed file download.
+            list(executor.map(download_file, parsed_url))
 
         for file in parsed_url:
-            file_to_save = open(full_path + file['name'], 'wb')
-            file_to_save.write(requests.get(file['download_url']).content)
-            file_to_save.close()
+            replace(part_path(file), staging_path + file['name'])
+            if file_store is not None:
+                file_store.add(staging_path + file['name'], key=file.get('sha'))
+        # The staging directory is kept between attempts, so it can still hold partial files of other versions and files that were removed since.
+        listed_names = set(file['name'] for file in parsed_url)
+        with scandir(staging_path) as staging_entries:
+            for staging_entry in staging_entries:
+                if staging_entry.name in listed_names:
+                    continue
+                if staging_entry.is_dir(follow_symlinks=False):
+                    rmtree(staging_entry.path)
+                else:
+                    remove(staging_entry.path)
+        write_manifest(staging_path, {file['name']: {"sha": file.get('sha', None), "size": file.get('size', 0)} for file in parsed_url})
+        swap_directory(staging_path, full_path, cleaner=cleaner)
+
+        if stats is not None:
+            stats["reused"] = bytes_reused[0]
+            stats["downloaded"] = bytes_total - bytes_reused[0]
 
         self.downloaded_dir_path = full_path
 
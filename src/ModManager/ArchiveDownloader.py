@@ -0,0 +1,106 @@
+from src.Network.RequestScheduler import RequestScheduler, RequestCancelled, PRIORITY_DOWNLOAD
+from src.Mod.Mod import swap_directory, write_manifest, STAGING_DIRECTORY, DOWNLOAD_CHUNK_SIZE
+from src.Storage.FileStore import FileStore, git_blob_sha_file
+from src.Storage.DirectoryCleaner import DirectoryCleaner
+from src.Logger.Loggable import Loggable
+from os.path import exists, dirname
+from os import makedirs
+from shutil import rmtree, copyfileobj
+from contextlib import ExitStack
+import tarfile
+
+
+GITHUB_API_URL = "https://api.github.com"
+
+
+class ArchiveDownloader(Loggable):
+    """
+    Downloads mods in bulk from a repository's archive.
+    The repository's tarball is requested once and streamed, and only the requested mod folders are extracted from it.
+    This replaces one contents listing per mod and one request per file with a single transfer.
+    Every extracted folder is staged first and swapped into place once it is complete, the same way single mod downloads are.
+    """
+    def __init__(self, logger, scheduler: RequestScheduler, file_store: FileStore = None, cleaner: DirectoryCleaner = None):
+        """
+        :param logger: Logger to use.
+        :param scheduler: Request scheduler to send the archive request through.
+        :param file_store: Optional file store to add the extracted files to.
+        :param cleaner: Optional directory cleaner to delete replaced downloads in the background.
+        """
+        super(ArchiveDownloader, self).__init__(logger=logger)
+        self.scheduler = scheduler
+        self.file_store = file_store
+        self.cleaner = cleaner
+        self.token = None
+
+    def download(self, repo_id: str, ref: str, folder_names: list[str], path: str, progress=None, cancel_event=None, locks: dict = None) -> list[str]:
+        """
+        Download mod folders from a repository's archive.
+        :param repo_id: Repository to download from ("owner/name").
+        :param ref: Branch, tag or commit SHA to download the archive at.
+        :param folder_names: Names of the folders under the repository's mods folder to extract.
+        :param path: Downloads directory to extract the folders into.
+        :param progress: Optional function that is called with (bytes done, bytes total) while the archive is streamed. Bytes total is 0 if the archive's size isn't known.
+        :param cancel_event: Optional event that cancels the download when set.
+        :param locks: Optional dictionary of folder name to the lock of its mod. A folder's lock is held from the moment its first file is extracted until it has been swapped into place, so other downloads of the same mod never share its staging directory.
+        :return: Names of the folders that were extracted.
+        :raises RequestCancelled: If the download was cancelled.
+        """
+        wanted = set(folder_names)
+        staged: dict[str, dict] = dict()
+        staging_root = path + STAGING_DIRECTORY
+
+        headers = {"Accept": "application/vnd.github.v3+json"}
+        if self.token is not None:
+            headers["Authorization"] = f"token {self.token}"
+
+        self.log(f"Downloading archive of {repo_id} at {ref} for {len(wanted)} mods.")
+        with ExitStack() as held_locks:
+            with self.scheduler.get(f"{GITHUB_API_URL}/repos/{repo_id}/tarball/{ref}", headers=headers, stream=True, priority=PRIORITY_DOWNLOAD) as response:
+                response.raise_for_status()
+                response.raw.decode_content = True
+                bytes_total = int(response.headers.get("Content-Length", 0) or 0)
+
+                with tarfile.open(fileobj=response.raw, mode="r|*") as archive:
+                    for member in archive:
+                        if cancel_event is not None and cancel_event.is_set():
+                            raise RequestCancelled(f"Archive download of {repo_id} was cancelled.")
+
+                        # Members are named "<owner>-<repo>-<commit>/mods/<folder>/<file path>".
+                        parts = member.name.split("/")
+                        if len(parts) < 4 or parts[1] != "mods" or parts[2] not in wanted or not member.isfile():
+                            continue
+                        if any(part in ["", ".", ".."] for part in parts[3:]):
+                            self.log(f"Skipping unsafe archive member: \"{member.name}\"", is_error=True)
+                            continue
+
+                        folder_name = parts[2]
+                        if folder_name not in staged:
+                            if locks is not None and folder_name in locks:
+                                held_locks.enter_context(locks[folder_name])
+                            # Partial files of an earlier single mod download can't be reused here.
+                            if exists(staging_root + folder_name):
+                                rmtree(staging_root + folder_name)
+                            staged[folder_name] = dict()
+
+                        file_name = "/".join(parts[3:])
+                        file_path = staging_root + folder_name + "/" + file_name
+                        makedirs(dirname(file_path), exist_ok=True)
+                        with archive.extractfile(member) as member_file, open(file_path, 'wb') as file_to_save:
+                            copyfileobj(member_file, file_to_save, DOWNLOAD_CHUNK_SIZE)
+                        sha = self.file_store.add(file_path) if self.file_store is not None else None
+                        staged[folder_name][file_name] = {"sha": sha or git_blob_sha_file(file_path), "size": member.size}
+
+                        if progress is not None:
+                            progress(response.raw.tell(), bytes_total)
+
+            for folder_name, files in staged.items():
+                write_manifest(staging_root + folder_name, files)
+                swap_directory(staging_root + folder_name, path + folder_name, cleaner=self.cleaner)
+
+        missing = wanted - set(staged)
+        if len(missing) > 0:
+            self.log(f"Archive of {repo_id} at {ref} did not contain: {', '.join(sorted(missing))}", is_error=True)
+        self.log(f"Extracted {len(staged)} mods from the archive of {repo_id}.")
+
+        return sorted(staged)
@@ -0,0 +1,255 @@
+from src.Network.RequestScheduler import RateLimitExceeded, PRIORITY_LISTING, PRIORITY_METADATA
+from src.Network.HttpCache import HttpCache
+from src.Logger.Loggable import Loggable
+from concurrent.futures import ThreadPoolExecutor, wait
+from threading import Event
+import requests
+import json
+
+
+GITHUB_API_URL = "https://api.github.com"
+GITHUB_RAW_URL = "https://raw.githubusercontent.com"
+
+
+class CatalogFetcher(Loggable):
+    """
+    Fetches mod information from the configured github repositories.
+    Each repository's mods folder is discovered through a single recursive git tree request, which lists every file's blob SHA and size.
+    Only the info.json files are fetched afterwards, concurrently on a bounded pool of worker threads.
+    Images are not fetched at all; each mod only gets a reference to its image (blob SHA & URL), so it can be loaded when it is needed.
+    All requests go through the HTTP cache, so an unchanged catalog is answered with 304s (or not requested at all) and costs no rate limit budget.
+    Mod folders whose tree SHA is already known are not fetched or parsed again at all.
+    Every mod entry can be handed out as soon as it is ready, while the rest of the fetch is still running.
+    A fetch can be cancelled from another thread. Entries that were already handed out stay handed out, but no further ones are, and the fetch returns no results.
+    """
+    def __init__(self, logger, cache: HttpCache, max_workers: int = 8):
+        """
+        :param logger: Logger to use.
+        :param cache: HTTP cache to fetch through.
+        :param max_workers: Maximum amount of requests to run at the same time.
+        """
+        super(CatalogFetcher, self).__init__(logger=logger)
+        self.cache = cache
+        self.token = None
+        self.max_workers = max(1, max_workers)
+        self.cancelled = Event()
+        self.rate_limited = False
+        self.unauthorised = False
+        self.fetched_repositories: list[str] = []
+        self.failed_keys: set[str] = set()
+        self.on_entry = None
+
+    def cancel(self) -> None:
+        """
+        Cancel the running fetch, if any.
+        Requests that are already in flight are allowed to finish, but no new ones are started.
+        """
+        self.cancelled.set()
+
+    def fetch(self, repository_ids: list[str], known_shas: dict[str, str] = None, on_entry=None) -> list[dict]:
+        """
+        Fetch all mods from the given repositories.
+        The repositories that were listed successfully are kept in fetched_repositories afterwards, and the keys of the mods whose listing or info.json could not be fetched (e.g. because of a network error or the rate limit) in failed_keys.
+        :param repository_ids: Ids of the repositories to fetch from.
+        :param known_shas: Tree SHAs of the mod folders seen in a previous fetch, by mod entry key ("<repository id>/<folder name>"). Folders with an unchanged SHA are marked as "unchanged" and not fetched.
+        :param on_entry: Optional function that is called with every mod entry as soon as it is ready (immediately for unchanged ones), from the worker threads. Not called for entries that could not be fetched.
+        :return: List of mod entries (with "key" identifying the folder, "sha" its tree SHA, "data" holding the info.json data, "url" the download url and "image_key" / "image_url" the image reference), in repository & folder order. Empty if cancelled.
+        """
+        known_shas = known_shas or dict()
+        self.on_entry = on_entry
+        self.cancelled.clear()
+        self.rate_limited = False
+        self.unauthorised = False
+        self.fetched_repositories = []
+        self.failed_keys = set()
+        self.cache.reset_stats()
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="CatalogFetcher") as executor:
+            repositories = self.__run_all(executor, self.__fetch_repository, repository_ids)
+            self.fetched_repositories = [repo_id for repo_id, repo_entries in repositories]
+            entries = [entry for repo_id, repo_entries in repositories for entry in repo_entries]
+
+            for entry in entries:
+                entry["unchanged"] = known_shas.get(entry["key"], None) == entry["sha"]
+                if entry["unchanged"]:
+                    self.__publish(entry)
+            changed_entries = [entry for entry in entries if not entry["unchanged"]]
+            self.log(f"{len(changed_entries)} of {len(entries)} mods changed since the last fetch.")
+
+            # Folders of truncated trees still need their own listing.
+            self.__run_all(executor, self.__fetch_subtree, [entry for entry in changed_entries if entry["files"] is None])
+
+            info_jobs = []
+            for entry in changed_entries:
+                for file in entry["files"] or []:
+                    if file["path"] == "info.json":
+                        info_jobs.append((entry, file))
+                    if file["path"] in ["mod.png", "mod.jpg"]:
+                        entry["image_key"] = file["sha"]
+                        entry["image_url"] = self.__file_url(entry, file)
+            self.__run_all(executor, lambda job: self.__fetch_info_file(*job), info_jobs)
+
+        self.cache.save()
+        self.log(f"Fetch finished. {self.cache.hits} responses reused from cache, {self.cache.misses} downloaded.")
+
+        if self.cancelled.is_set():
+            self.log("Fetch cancelled.")
+            return []
+
+        mods = []
+        for entry in entries:
+            if entry["unchanged"] or entry.get("data") is not None:
+                mods.append(entry)
+            elif entry["key"] not in self.failed_keys:
+                self.log(f"Mod found without info.json file. Please report this to the modding community! Mod in question is: \"{entry['name']}\"")
+        return mods
+
+    def __publish(self, entry: dict) -> None:
+        """
+        Hand a finished mod entry to the on_entry function, if there is one and the fetch wasn't cancelled.
+        :param entry: Entry to publish.
+        """
+        if self.on_entry is None or self.cancelled.is_set():
+            return
+        try:
+            self.on_entry(entry)
+        except Exception as e:
+            self.log(str(e), is_error=True)
+
+    def __request_failed(self, exception: Exception) -> None:
+        """
+        Log a failed request, and note whether it failed because the rate limit ran out or the token was rejected.
+        :param exception: Exception the request failed with.
+        """
+        self.log(str(exception), is_error=True)
+        if isinstance(exception, RateLimitExceeded):
+            self.rate_limited = True
+        elif isinstance(exception, requests.HTTPError) and exception.response is not None:
+            if exception.response.status_code in [403, 429]:
+                self.rate_limited = True
+            elif exception.response.status_code == 401:
+                self.unauthorised = True
+
+    def __api_headers(self) -> dict:
+        """
+        Headers to send along with Github API requests.
+        :return: Dictionary of headers.
+        """
+        headers = {"Accept": "application/vnd.github.v3+json"}
+        if self.token:
+            headers["Authorization"] = f"token {self.token}"
+        return headers
+
+    def __get_api(self, path: str):
+        """
+        Get and decode a Github API resource.
+        :param path: Path of the resource, relative to the API root.
+        :return: Decoded JSON response.
+        """
+        return json.loads(self.cache.get(f"{GITHUB_API_URL}/{path}", headers=self.__api_headers(), priority=PRIORITY_LISTING))
+
+    def __run_all(self, executor: ThreadPoolExecutor, func, items: list) -> list:
+        """
+        Run a function on every item using the executor, and wait for all of them to finish.
+        :param executor: Executor to submit to.
+        :param func: Function to call for every item. Returning None drops the item from the results.
+        :param items: Items to run the function on.
+        :return: Results of the function calls, in the same order as the items.
+        """
+        if self.cancelled.is_set():
+            return []
+        futures = [executor.submit(func, item) for item in items]
+        wait(futures)
+        return [future.result() for future in futures if future.result() is not None]
+
+    def __new_entry(self, repo_id: str, branch: str, name: str, sha: str) -> dict:
+        """
+        Create the dictionary that collects a mod's fetched info.
+        :param repo_id: Id of the repository the mod is in.
+        :param branch: Branch the mod was listed from.
+        :param name: Name of the mod's folder.
+        :param sha: Tree SHA of the mod's folder.
+        :return: New mod entry, without a file listing.
+        """
+        return {
+            "key": f"{repo_id}/{name}",
+            "repo_id": repo_id,
+            "branch": branch,
+            "name": name,
+            "sha": sha,
+            "url": f"{GITHUB_API_URL}/repos/{repo_id}/contents/mods/{name}?ref={branch}",
+            "files": None
+        }
+
+    def __fetch_repository(self, repo_id: str):
+        """
+        Fetch a repository's mod folders, and the files in them, with a single recursive tree request.
+        If Github truncated the tree, only the mod folders are listed and their files are left to __fetch_subtree.
+        :param repo_id: Id of the repository.
+        :return: (repository id, list of mod entries) tuple, or None if the fetch failed or was cancelled.
+        """
+        if self.cancelled.is_set():
+            return None
+        try:
+            branch = self.__get_api(f"repos/{repo_id}")["default_branch"]
+            tree = self.__get_api(f"repos/{repo_id}/git/trees/{branch}?recursive=1")
+
+            if tree.get("truncated", False):
+                self.log(f"Tree of \"{repo_id}\" was truncated, listing mod folders separately.")
+                mods_tree = next(item for item in self.__get_api(f"repos/{repo_id}/git/trees/{branch}")["tree"] if item["path"] == "mods")
+                return repo_id, [self.__new_entry(repo_id, branch, item["path"], item["sha"]) for item in self.__get_api(f"repos/{repo_id}/git/trees/{mods_tree['sha']}")["tree"] if item["type"] == "tree"]
+
+            entries = dict()
+            for item in tree["tree"]:
+                path = item["path"].split("/")
+                if len(path) < 2 or path[0] != "mods":
+                    continue
+                if len(path) == 2 and item["type"] == "tree":
+                    entries[path[1]] = self.__new_entry(repo_id, branch, path[1], item["sha"])
+                    entries[path[1]]["files"] = []
+                elif len(path) > 2 and item["type"] == "blob" and path[1] in entries:
+                    entries[path[1]]["files"].append({"path": "/".join(path[2:]), "sha": item["sha"], "size": item.get("size", 0)})
+            return repo_id, list(entries.values())
+        except Exception as e:
+            self.__request_failed(e)
+        return None
+
+    def __fetch_subtree(self, entry: dict) -> None:
+        """
+        Fetch the file listing of a single mod's folder into its entry.
+        Only used when the repository's tree was too large to be listed in one request.
+        :param entry: Entry of the mod to list.
+        """
+        if self.cancelled.is_set():
+            return
+        try:
+            self.log(f"Fetching mod from: \"{entry['url']}\"")
+            tree = self.__get_api(f"repos/{entry['repo_id']}/git/trees/{entry['sha']}?recursive=1")
+            entry["files"] = [{"path": item["path"], "sha": item["sha"], "size": item.get("size", 0)} for item in tree["tree"] if item["type"] == "blob"]
+        except Exception as e:
+            self.__request_failed(e)
+            self.failed_keys.add(entry["key"])
+
+    def __file_url(self, entry: dict, file: dict) -> str:
+        """
+        Get the raw download URL of a file in a mod's folder.
+        :param entry: Entry of the mod the file belongs to.
+        :param file: File listing entry of the file.
+        :return: The file's URL.
+        """
+        return f"{GITHUB_RAW_URL}/{entry['repo_id']}/{entry['branch']}/mods/{entry['name']}/{file['path']}"
+
+    def __fetch_info_file(self, entry: dict, file: dict) -> None:
+        """
+        Fetch and decode a mod's info.json file into its entry.
+        :param entry: Entry of the mod the file belongs to.
+        :param file: File listing entry of the file.
+        """
+        if self.cancelled.is_set():
+            return
+        try:
+            entry["data"] = json.loads(self.cache.get(self.__file_url(entry, file), content_sha=file["sha"], priority=PRIORITY_METADATA).decode("utf-8"))
+            self.__publish(entry)
+        except Exception as e:
+            self.__request_failed(e)
+            self.failed_keys.add(entry["key"])
@@ -0,0 +1,279 @@
+from src.Logger.Loggable import Loggable
+from src.Mod.Mod import Mod
+from dataclasses import dataclass, field
+from threading import RLock
+import re
+
+
+def parse_mod_reference(reference: str, known_ids=None) -> tuple:
+    """
+    Parse a mod reference from an info.json's Requirements or Incompatible list.
+    References are either a plain mod id, or a mod id followed by a minimum version (e.g. "SomeMod-1.2.0").
+    Mod ids may end in a dash and a number themselves (e.g. "ShipyardExpansion-2"), so references that are a known mod id as a whole are never split.
+    :param reference: Reference to parse.
+    :param known_ids: Optional collection of known mod ids.
+    :return: Tuple of the referenced mod id and its minimum version (None if not given).
+    """
+    reference = reference.strip()
+    if known_ids is not None and reference in known_ids:
+        return reference, None
+    match = re.fullmatch(r"(.+)-(\d+(?:\.\d+)*\w*)", reference)
+    if match is None:
+        return reference, None
+    return match.group(1), match.group(2)
+
+
+def version_tuple(version: str) -> tuple:
+    """
+    Turn a version string into a tuple of numbers that can be compared.
+    :param version: Version string, e.g. "1.2.10".
+    :return: Tuple of the version's numbers, e.g. (1, 2, 10).
+    """
+    return tuple(int(number) for number in re.findall(r"\d+", version or ""))
+
+
+@dataclass
+class InstallPlan:
+    """
+    Result of resolving the dependencies of one or more mods.
+    """
+    waves: list = field(default_factory=list)
+    missing: dict = field(default_factory=dict)
+    cycles: list = field(default_factory=list)
+    conflicts: list = field(default_factory=list)
+    outdated: list = field(default_factory=list)
+
+    @property
+    def mod_ids(self) -> list[str]:
+        """
+        :return: Ids of all mods to install, in install order.
+        """
+        return [mod_id for wave in self.waves for mod_id in wave]
+
+    @property
+    def ok(self) -> bool:
+        """
+        :return: Whether or not the plan can be installed. Plans with conflicts can not.
+        """
+        return len(self.conflicts) == 0
+
+
+class DependencyGraph(Loggable):
+    """
+    Index of the requirements and incompatibilities between all mods in the catalog.
+    Edges are kept in both directions, and are updated per mod whenever a mod changes, so the graph never has to be rebuilt as a whole.
+    References are parsed against the mod ids in the graph, and parsed again when a mod id they might refer to as a whole is added or removed.
+    Install plans are resolved from the index in time linear to the size of the resolved dependency tree.
+    """
+    def __init__(self, logger):
+        """
+        :param logger: Logger to use.
+        """
+        super(DependencyGraph, self).__init__(logger=logger)
+        self.versions: dict[str, str] = dict()
+        self.references: dict[str, tuple] = dict()
+        self.referenced_by: dict[str, set] = dict()
+        self.requirements: dict[str, dict] = dict()
+        self.dependents: dict[str, set] = dict()
+        self.incompatible: dict[str, set] = dict()
+        self.incompatible_with: dict[str, set] = dict()
+        self.lock = RLock()
+
+    def update(self, mod: Mod) -> None:
+        """
+        Add a mod to the graph, or replace its edges if it is in the graph already.
+        :param mod: The mod to index.
+        """
+        with self.lock:
+            is_new = mod.id not in self.versions
+            self.__remove_references(mod.id)
+            self.versions[mod.id] = mod.version
+            self.references[mod.id] = (list(mod.requirements or []), list(mod.incompatible or []))
+            self.__add_references(mod.id)
+            if is_new:
+                self.__reparse_references_to(mod.id)
+
+    def remove(self, mod_id: str) -> None:
+        """
+        Remove a mod's own edges from the graph. Edges of other mods pointing to it are kept, so they show up as missing.
+        :param mod_id: Mod id of the mod to remove.
+        """
+        with self.lock:
+            if mod_id not in self.versions and mod_id not in self.references:
+                return
+            self.versions.pop(mod_id, None)
+            self.__remove_references(mod_id)
+            self.__reparse_references_to(mod_id)
+
+    def clear(self) -> None:
+        """
+        Remove all mods from the graph.
+        """
+        with self.lock:
+            self.versions.clear()
+            self.references.clear()
+            self.referenced_by.clear()
+            self.requirements.clear()
+            self.dependents.clear()
+            self.incompatible.clear()
+            self.incompatible_with.clear()
+
+    def get_dependents(self, mod_id: str) -> set:
+        """
+        Get the mods that directly require a mod.
+        :param mod_id: Mod id of the required mod.
+        :return: Set of mod ids.
+        """
+        with self.lock:
+            return set(self.dependents.get(mod_id, set()))
+
+    def resolve(self, mod_ids: list[str], installed: set = None) -> InstallPlan:
+        """
+        Resolve everything that has to be installed for the given mods.
+        The requirements are followed transitively; mods that are installed already are not part of the plan, but do count for conflicts.
+        Mods are grouped into waves, where every mod only requires mods of earlier waves, so each wave can be installed in parallel.
+        Mods that require each other in a cycle can't be ordered, and are installed together in a wave of their own once the mods they require are. Mods that need them follow in later waves, ordered as usual.
+        :param mod_ids: Mod ids of the mods to install.
+        :param installed: Mod ids of the mods that are installed already.
+        :return: The resolved install plan.
+        """
+        installed = installed or set()
+        plan = InstallPlan()
+        with self.lock:
+            # Transitive closure of the requirements.
+            to_install = set()
+            stack = [mod_id for mod_id in mod_ids if mod_id not in installed]
+            while stack:
+                mod_id = stack.pop()
+                if mod_id in to_install:
+                    continue
+                if mod_id not in self.versions:
+                    continue
+                to_install.add(mod_id)
+                for requirement_id, minimum_version in self.requirements[mod_id].items():
+                    if requirement_id not in self.versions and requirement_id not in installed:
+                        plan.missing.setdefault(requirement_id, []).append(mod_id)
+                        continue
+                    if minimum_version is not None and requirement_id in self.versions and version_tuple(self.versions[requirement_id]) < version_tuple(minimum_version):
+                        plan.outdated.append((mod_id, requirement_id, minimum_version))
+                    if requirement_id not in installed:
+                        stack.append(requirement_id)
+            for mod_id in mod_ids:
+                if mod_id not in self.versions and mod_id not in installed:
+                    plan.missing.setdefault(mod_id, [])
+
+            # Incompatibilities with other planned or installed mods, whichever of both mods declares them.
+            for mod_id in sorted(to_install):
+                for incompatible_id in sorted(self.incompatible.get(mod_id, set()) | self.incompatible_with.get(mod_id, set())):
+                    if incompatible_id in installed or (incompatible_id in to_install and mod_id < incompatible_id):
+                        plan.conflicts.append((mod_id, incompatible_id))
+
+            # Topological order in waves (Kahn's algorithm), only counting requirements that are part of the plan.
+            # When no mod can be ordered anymore, the cycles that only require ordered mods form the next wave, and ordering continues after them.
+            remaining = {mod_id: set(requirement_id for requirement_id in self.requirements[mod_id] if requirement_id in to_install) for mod_id in to_install}
+            wave = sorted(mod_id for mod_id, requirements in remaining.items() if len(requirements) == 0)
+            while len(remaining) > 0:
+                if len(wave) == 0:
+                    wave = self.__find_ready_cycles(remaining)
+                    plan.cycles.extend(wave)
+                plan.waves.append(wave)
+                for mod_id in wave:
+                    del remaining[mod_id]
+                next_wave = set()
+                for mod_id in wave:
+                    for dependent_id in self.dependents.get(mod_id, set()):
+                        if dependent_id in remaining:
+                            remaining[dependent_id].discard(mod_id)
+                            if len(remaining[dependent_id]) == 0:
+                                next_wave.add(dependent_id)
+                wave = sorted(next_wave)
+        return plan
+
+    def __add_references(self, mod_id: str) -> None:
+        """
+        Parse a mod's references, and add its requirement and incompatibility edges. Expects the lock to be held.
+        :param mod_id: Mod id of the mod to add the edges of.
+        """
+        requirements, incompatible = self.references[mod_id]
+        for reference in requirements + incompatible:
+            self.referenced_by.setdefault(reference.strip(), set()).add(mod_id)
+        self.requirements[mod_id] = dict(parse_mod_reference(reference, self.versions) for reference in requirements)
+        for requirement_id in self.requirements[mod_id]:
+            self.dependents.setdefault(requirement_id, set()).add(mod_id)
+        self.incompatible[mod_id] = set(parse_mod_reference(reference, self.versions)[0] for reference in incompatible)
+        for incompatible_id in self.incompatible[mod_id]:
+            self.incompatible_with.setdefault(incompatible_id, set()).add(mod_id)
+
+    def __remove_references(self, mod_id: str) -> None:
+        """
+        Remove a mod's requirement and incompatibility edges. Expects the lock to be held.
+        :param mod_id: Mod id of the mod to remove the edges of.
+        """
+        requirements, incompatible = self.references.pop(mod_id, ([], []))
+        for reference in requirements + incompatible:
+            self.referenced_by.get(reference.strip(), set()).discard(mod_id)
+        for requirement_id in self.requirements.pop(mod_id, dict()):
+            self.dependents.get(requirement_id, set()).discard(mod_id)
+        for incompatible_id in self.incompatible.pop(mod_id, set()):
+            self.incompatible_with.get(incompatible_id, set()).discard(mod_id)
+
+    def __reparse_references_to(self, mod_id: str) -> None:
+        """
+        Parse the references of the mods that refer to a mod id as a whole again, after that mod id was added or removed. Expects the lock to be held.
+        :param mod_id: Mod id that was added or removed.
+        """
+        for referring_id in list(self.referenced_by.get(mod_id, set())):
+            if referring_id in self.references:
+                references = self.references[referring_id]
+                self.__remove_references(referring_id)
+                self.references[referring_id] = references
+                self.__add_references(referring_id)
+
+    @staticmethod
+    def __find_ready_cycles(remaining: dict) -> list[str]:
+        """
+        Find the requirement cycles that can be installed next, among the mods that couldn't be ordered.
+        These are the strongly connected groups of mods whose requirements all lie within their own group (found with Tarjan's algorithm). Mods that only depend on a cycle, and cycles that depend on other cycles, are left for later waves.
+        :param remaining: Dictionary of unordered mod id to its unordered requirements.
+        :return: Sorted mod ids of the mods in the ready cycles.
+        """
+        index: dict[str, int] = dict()
+        lowlink: dict[str, int] = dict()
+        stack: list[str] = []
+        on_stack: set = set()
+        ready: list[str] = []
+
+        def visit(mod_id: str) -> None:
+            index[mod_id] = lowlink[mod_id] = len(index)
+            stack.append(mod_id)
+            on_stack.add(mod_id)
+
+        for root_id in sorted(remaining):
+            if root_id in index:
+                continue
+            visit(root_id)
+            work = [(root_id, iter(sorted(remaining[root_id])))]
+            while work:
+                mod_id, requirements = work[-1]
+                for requirement_id in requirements:
+                    if requirement_id not in index:
+                        visit(requirement_id)
+                        work.append((requirement_id, iter(sorted(remaining[requirement_id]))))
+                        break
+                    if requirement_id in on_stack:
+                        lowlink[mod_id] = min(lowlink[mod_id], index[requirement_id])
+                else:
+                    work.pop()
+                    if work:
+                        lowlink[work[-1][0]] = min(lowlink[work[-1][0]], lowlink[mod_id])
+                    if lowlink[mod_id] == index[mod_id]:
+                        component = set()
+                        while True:
+                            member_id = stack.pop()
+                            on_stack.discard(member_id)
+                            component.add(member_id)
+                            if member_id == mod_id:
+                                break
+                        if all(remaining[member_id] <= component for member_id in component):
+                            ready.extend(component)
+        return sorted(ready)
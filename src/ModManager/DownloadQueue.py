@@ -0,0 +1,210 @@
+from src.Network.RequestScheduler import RequestCancelled
+from src.Logger.Loggable import Loggable
+from dataclasses import dataclass, field
+from threading import Thread, Event, Lock, current_thread
+from queue import PriorityQueue
+from itertools import count
+from typing import Callable
+
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+JOB_CANCELLED = "cancelled"
+
+
+@dataclass
+class DownloadJob:
+    """
+    Represents a job in the download queue.
+    """
+    id: int
+    mod_id: str
+    kind: str
+    priority: int
+    func: Callable = field(repr=False, default=None)
+    status: str = JOB_QUEUED
+    bytes_done: int = 0
+    bytes_total: int = 0
+    coordinator: bool = False
+    cancel_event: Event = field(repr=False, default_factory=Event)
+    finished_event: Event = field(repr=False, default_factory=Event)
+
+    @property
+    def percentage(self) -> int:
+        """
+        :return: How much of the job's data has been transferred, in percent.
+        """
+        if self.bytes_total <= 0:
+            return 0
+        return int(self.bytes_done * 100 / self.bytes_total)
+
+    @property
+    def finished(self) -> bool:
+        """
+        :return: Whether or not the job has stopped, either successfully or not.
+        """
+        return self.status in [JOB_DONE, JOB_FAILED, JOB_CANCELLED]
+
+    def wait(self, timeout: float = None) -> bool:
+        """
+        Block until the job has stopped.
+        :param timeout: Maximum amount of seconds to wait. Waits indefinitely if not given.
+        :return: Whether or not the job has stopped.
+        """
+        return self.finished_event.wait(timeout)
+
+
+class DownloadQueue(Loggable):
+    """
+    Central queue of mod downloads (and other jobs that transfer mods).
+    Jobs are ran by a fixed amount of worker threads, highest priority (lowest number) first, and can be cancelled while queued or running.
+    Coordinator jobs, which only queue other jobs and wait for them (e.g. a batch that queues a job per mod), run on their own thread instead, so they never hold a worker the jobs they wait for need.
+    Listeners are notified of every change to a job, from the worker threads.
+    """
+    def __init__(self, logger, max_workers: int = 2):
+        """
+        :param logger: Logger to use.
+        :param max_workers: Maximum amount of jobs to run at the same time.
+        """
+        super(DownloadQueue, self).__init__(logger=logger)
+        self.queue = PriorityQueue()
+        self.jobs: dict[int, DownloadJob] = dict()
+        self.job_ids = count(1)
+        self.listeners = []
+        self.lock = Lock()
+
+        self.workers = [Thread(target=self.__work, name=f"DownloadQueue-{i}", daemon=True) for i in range(max(1, max_workers))]
+        for worker in self.workers:
+            worker.start()
+
+    def add_listener(self, listener) -> None:
+        """
+        Add a function to be called with a job whenever it changes.
+        :param listener: Function to call.
+        """
+        self.listeners.append(listener)
+
+    def submit(self, mod_id: str, func, kind: str = "download", priority: int = 0, coordinator: bool = False) -> DownloadJob:
+        """
+        Add a job to the queue.
+        If the mod already has an unfinished job of the same kind (e.g. because a button was clicked twice), that job is returned instead, and nothing is queued.
+        :param mod_id: Mod id of the mod the job is for.
+        :param func: Function that runs the job. Called with a progress function (bytes done, bytes total) and a cancel event, and should return whether or not it was successful.
+        :param kind: What kind of job this is, for display purposes.
+        :param priority: Priority of the job. Lower runs first.
+        :param coordinator: Whether or not the job only queues other jobs and waits for them. Coordinator jobs start right away on their own thread.
+        :return: The queued job, or the mod's unfinished job of the same kind.
+        """
+        with self.lock:
+            for job in self.jobs.values():
+                if job.mod_id == mod_id and job.kind == kind and job.coordinator == coordinator and not job.finished:
+                    self.log(f"{kind.capitalize()} of mod \"{mod_id}\" is already queued.", is_verbose=True)
+                    return job
+            job = DownloadJob(id=next(self.job_ids), mod_id=mod_id, kind=kind, priority=priority, func=func, coordinator=coordinator)
+            self.jobs[job.id] = job
+        self.log(f"Queued {kind} of mod: \"{mod_id}\"")
+        self.__notify(job)
+        if coordinator:
+            Thread(target=self.__run, args=(job,), name=f"DownloadQueue-{kind}", daemon=True).start()
+        else:
+            self.queue.put((priority, job.id))
+        return job
+
+    def is_worker(self) -> bool:
+        """
+        Check whether the calling thread is one of the queue's workers, which must never wait for other jobs.
+        :return: Whether or not the calling thread is a worker.
+        """
+        return current_thread() in self.workers
+
+    def cancel(self, job_id: int) -> bool:
+        """
+        Cancel a job. Queued jobs are skipped, running jobs are stopped as soon as they check their cancel event.
+        :param job_id: Id of the job to cancel.
+        :return: Whether or not there was an unfinished job to cancel.
+        """
+        with self.lock:
+            job = self.jobs.get(job_id, None)
+            if job is None or job.finished:
+                return False
+            job.cancel_event.set()
+            if job.status == JOB_QUEUED:
+                job.status = JOB_CANCELLED
+                job.finished_event.set()
+        self.log(f"Cancelled {job.kind} of mod: \"{job.mod_id}\"")
+        self.__notify(job)
+        return True
+
+    def get_jobs(self) -> list[DownloadJob]:
+        """
+        Get all jobs, in the order they were submitted.
+        :return: List of jobs.
+        """
+        with self.lock:
+            return list(self.jobs.values())
+
+    def clear_finished(self) -> None:
+        """
+        Forget all finished jobs.
+        """
+        with self.lock:
+            for job_id in [job.id for job in self.jobs.values() if job.finished]:
+                del self.jobs[job_id]
+
+    def __notify(self, job: DownloadJob) -> None:
+        """
+        Notify all listeners of a change to a job.
+        :param job: Job that changed.
+        """
+        for listener in list(self.listeners):
+            try:
+                listener(job)
+            except Exception as e:
+                self.log(f"Download queue listener failed. Exception: {e}", is_error=True)
+
+    def __work(self) -> None:
+        """
+        Worker thread loop. Takes jobs from the queue and runs them.
+        """
+        while True:
+            priority, job_id = self.queue.get()
+            with self.lock:
+                job = self.jobs.get(job_id, None)
+            if job is not None:
+                self.__run(job)
+
+    def __run(self, job: DownloadJob) -> None:
+        """
+        Run a job, unless it was cancelled while it was queued.
+        :param job: Job to run.
+        """
+        with self.lock:
+            if job.status != JOB_QUEUED:
+                return
+            job.status = JOB_RUNNING
+        self.__notify(job)
+
+        def progress(bytes_done: int, bytes_total: int) -> None:
+            previous_percentage = job.percentage
+            job.bytes_done = bytes_done
+            job.bytes_total = bytes_total
+            if job.percentage != previous_percentage:
+                self.__notify(job)
+
+        try:
+            success = job.func(progress, job.cancel_event)
+            status = JOB_DONE if success else JOB_FAILED
+        except RequestCancelled:
+            status = JOB_CANCELLED
+        except Exception as e:
+            self.log(f"{job.kind.capitalize()} of mod \"{job.mod_id}\" failed. Exception: {e}", is_error=True)
+            status = JOB_FAILED
+
+        if job.cancel_event.is_set() and status != JOB_DONE:
+            status = JOB_CANCELLED
+        with self.lock:
+            job.status = status
+            job.finished_event.set()
+        self.__notify(job)
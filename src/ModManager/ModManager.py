@@ -1,20 +1,39 @@
+from src.ModManager.RefreshScheduler import RefreshScheduler, REFRESH_DOWNLOADS, REFRESH_MODS
+from src.ModManager.DownloadQueue import DownloadQueue, DownloadJob, JOB_DONE
+from src.ModManager.DependencyGraph import DependencyGraph, InstallPlan
+from src.ModManager.ArchiveDownloader import ArchiveDownloader
+from src.ModManager.CatalogFetcher import CatalogFetcher
+from src.Storage.ImageStore import ImageStore
+from src.Storage.FileStore import FileStore
+from src.Storage.LocalModIndex import LocalModIndex
+from src.Storage.DirectoryWatcher import DirectoryWatcher
+from src.Storage.DirectoryCleaner import DirectoryCleaner, OLD_DIRECTORY_MARKER, NEW_DIRECTORY_MARKER, TRASH_DIRECTORY
+from src.Network.RequestScheduler import RequestScheduler, PRIORITY_LISTING, PRIORITY_METADATA, PRIORITY_IMAGE
+from src.Network.HttpTransport import HttpTransport
+from src.Network.HttpCache import HttpCache
 from src.Logger.Loggable import Loggable
 from src.Config.Config import Config
-from src.Mod.Mod import Mod
-from shutil import rmtree, copytree
-from github import Github
+from src.Mod.Mod import Mod, read_manifest, write_manifest, swap_directory
+from shutil import rmtree, copytree, copy2
+from threading import RLock, Lock, Event
 from copy import copy
-import requests
 import json
+import time
 import os
 
 
+INSTALL_COPY = "copy"
+INSTALL_HARDLINK = "hardlink"
+INSTALL_SYMLINK = "symlink"
+INSTALL_STRATEGIES = [INSTALL_COPY, INSTALL_HARDLINK, INSTALL_SYMLINK]
+
+
 class ModManager(Loggable):
     """
     Instance of a Mod Manager.
     Handles:
         - Fetching of mod information
-        - Caching of mod information (optional / TODO)
+        - Caching of fetched mod information
         - Downloading of mods
         - Managing of mod installation (optional / TODO)
     """
@@ -22,37 +41,233 @@ class ModManager(Loggable):
         super(ModManager, self).__init__(logger=logger)
         self.mods: dict[str, Mod] = dict()
         self.installed_mods: dict[str, Mod] = dict()
+        self.remote_folders: dict[str, dict] = dict()
+        self.mods_lock: RLock = RLock()
+        self.mod_locks: dict[str, RLock] = dict()
+        self.mod_locks_lock: Lock = Lock()
+        self.catalog_snapshot_path: str = "./data/cache/catalog.json"
         self.config: Config = config or Config()
-        self.git: Github = self.__init_git()
+        self.use_token: bool = True
+        self.transport: HttpTransport = HttpTransport(
+            logger,
+            timeout=self.config.config.get("http_timeout", 15),
+            retries=self.config.config.get("http_retries", 3),
+            pool_size=self.config.config.get("http_pool_size", 8)
+        )
+        self.scheduler: RequestScheduler = RequestScheduler(
+            logger,
+            self.transport,
+            max_concurrent=self.config.config.get("fetch_workers", 8),
+            max_wait=self.config.config.get("rate_limit_max_wait", 900)
+        )
+        self.http_cache: HttpCache = HttpCache(logger, self.scheduler)
+        self.image_store: ImageStore = ImageStore(logger, max_bytes=self.config.config.get("image_store_max_bytes", 64 * 1024 * 1024))
+        self.fetcher: CatalogFetcher = CatalogFetcher(logger, self.http_cache, self.config.config.get("fetch_workers", 8))
+        self.file_store: FileStore = FileStore(logger)
+        self.cleaner: DirectoryCleaner = DirectoryCleaner(logger)
+        self.local_index: LocalModIndex = LocalModIndex(logger, max_workers=self.config.config.get("scan_workers", 8))
+        self.archive_downloader: ArchiveDownloader = ArchiveDownloader(logger, self.scheduler, file_store=self.file_store, cleaner=self.cleaner)
+        self.download_queue: DownloadQueue = DownloadQueue(logger, max_workers=self.config.config.get("max_concurrent_downloads", 2))
+        self.dependency_graph: DependencyGraph = DependencyGraph(logger)
+        self.watcher: DirectoryWatcher = DirectoryWatcher(logger, self.__local_folders_changed)
+        self.refresh_scheduler: RefreshScheduler = RefreshScheduler(logger, {REFRESH_DOWNLOADS: self.__refresh_downloaded_mods, REFRESH_MODS: self.__refresh_installed_mods})
+        self.local_listeners: list = []
 
         self.filter_tags = []
         self.filter_search = ""
 
-        # TODO: Might freeze the GUI for a couple of seconds if you have a lot of mods installed?
-        # Issue is, where to refresh these while keeping the fetching & refreshing split up between downloaded & installed mods on the GUI threads?
-        self.__refresh_downloaded_mods()
-        self.__refresh_installed_mods()
+        # Local mods are scanned by the refresh scheduler's worker rather than here, so a large mods folder doesn't hold up startup.
+        # The refresh scheduler's listeners fill in the mod lists once the scan has finished.
+        self.local_scan_done: Event = Event()
+        self.__load_catalog_snapshot()
+        self.refresh_scheduler.add_listener(lambda directory_names: self.local_scan_done.set())
+        self.refresh_scheduler.invalidate(REFRESH_DOWNLOADS, REFRESH_MODS)
 
-    def __init_git(self, use_token: bool = True) -> Github:
+        # Old versions that were swapped out, but not deleted yet when the manager was last closed.
+        # The game's mods directory belongs to the user, so it is only swept if updates are staged in it (see __install_staging_dir).
+        self.cleaner.sweep(self.config.config.get("downloads_directory", None))
+        if os.path.isdir(self.config.config.get("mods_directory", None) or ""):
+            self.cleaner.sweep(self.__install_staging_dir())
+
+        if self.config.config.get("watch_local_directories", True):
+            self.watch_local_directories()
+
+    def watch_local_directories(self) -> None:
         """
-        Initialise the Github connection.
-        Uses a token if one is configured in the config.
-        :return: Github connection instance
+        Start watching the downloads & mods directories, so changes made to them (by the manager or by anything else) are applied to the mod lists as they happen.
+        Call again after changing either directory.
         """
-        git_token = None
-        if use_token:
-            git_token = self.config.config.get("github_access_token", None)
-        if git_token:
-            return Github(login_or_token=git_token)
-        else:
-            return Github()
+        downloads_dir = self.config.config.get("downloads_directory", None)
+        if downloads_dir not in [None, ""]:
+            # The downloads directory is the manager's own, so it's created here rather than on the first download, which would be too late to watch it.
+            os.makedirs(downloads_dir, exist_ok=True)
+        self.watcher.watch([downloads_dir, self.config.config.get("mods_directory", None)])
+
+    def stop_watching(self) -> None:
+        """
+        Stop watching the downloads & mods directories.
+        """
+        self.watcher.stop()
+
+    def add_local_listener(self, listener) -> None:
+        """
+        Register a function that is called whenever a single downloaded or installed mod was added, changed or removed by a change on disk.
+        Called from the watcher's thread with (mod id, whether or not it is an installed mod, the mod or None if it was removed).
+        :param listener: Function to call.
+        """
+        self.local_listeners.append(listener)
+
+    def __notify_local_listeners(self, mod_id: str, installed: bool, mod: Mod) -> None:
+        """
+        Tell the local listeners a downloaded or installed mod changed.
+        :param mod_id: Mod id of the mod that changed.
+        :param installed: Whether or not the change was to an installed mod.
+        :param mod: The mod, or None if it was removed.
+        """
+        for listener in self.local_listeners:
+            try:
+                listener(mod_id, installed, mod)
+            except Exception as e:
+                self.log(f"Local mod listener failed. Exception: {e}", is_error=True)
+
+    def __local_folders_changed(self, directory: str, names: set) -> None:
+        """
+        Apply changes to mod folders in the downloads or mods directory to the mod lists. Called from the watcher's thread.
+        Only the changed folders are scanned again; the rest of the directory isn't touched.
+        :param directory: Directory the changes were in.
+        :param names: Names of the mod folders that changed, or None if the whole directory has to be rescanned.
+        """
+        installed = os.path.abspath(directory) == os.path.abspath(self.config.config.get("mods_directory", None) or "")
+        if not installed and os.path.abspath(directory) != os.path.abspath(self.config.config.get("downloads_directory", None) or ""):
+            return
+        if directory[-1] != "/":
+            directory += "/"
+
+        if names is None:
+            names = set(name for name in os.listdir(directory) if not name.startswith("."))
+            with self.mods_lock:
+                local_mods = self.installed_mods if installed else self.mods
+                path_attribute = "installed_dir_path" if installed else "downloaded_dir_path"
+                names.update(os.path.basename(os.path.normpath(getattr(mod, path_attribute))) for mod in local_mods.values() if getattr(mod, path_attribute) not in [None, ""])
+
+        for name in sorted(names):
+            self.log(f"Local mod folder changed: \"{directory}{name}\"", is_verbose=True)
+            try:
+                entry = self.local_index.scan_folder(directory, name, force=True)
+            except Exception as e:
+                self.log(f"Could not scan changed mod folder \"{directory}{name}\". Exception: {e}", is_error=True)
+                continue
+            try:
+                if installed:
+                    self.__apply_installed_folder(directory + name, entry)
+                else:
+                    self.__apply_downloaded_folder(directory + name, entry)
+            except Exception as e:
+                self.log(str(e), is_error=True)
+        self.local_index.save()
+
+    def __apply_downloaded_folder(self, path: str, entry: dict) -> None:
+        """
+        Apply a changed download folder to the mod list.
+        A removed download falls back to the mod's remote entry if it has one, and is dropped from the list otherwise.
+        :param path: Path of the download folder.
+        :param entry: Local index entry of the folder, or None if it was removed.
+        """
+        with self.mods_lock:
+            previous = next((mod for mod in self.mods.values() if mod.downloaded_dir_path not in [None, ""] and os.path.normpath(mod.downloaded_dir_path) == os.path.normpath(path)), None)
+            mod = None
+            if entry is not None and entry["data"] is not None:
+                mod = self.parse_mod(entry["data"], image_path=entry["image_path"], download_dir=path)
+                self.update_mod_list([mod])
+                mod = self.mods[mod.id]
+            if previous is not None and (mod is None or previous.id != mod.id):
+                remote_folder = next((folder for folder in self.remote_folders.values() if folder["id"] == previous.id), None)
+                if remote_folder is not None:
+                    self.mods[previous.id] = self.parse_mod(remote_folder["data"], download_url=remote_folder["url"], image_key=remote_folder.get("image_key"), image_url=remote_folder.get("image_url"))
+                    self.dependency_graph.update(self.mods[previous.id])
+                    self.__notify_local_listeners(previous.id, False, self.mods[previous.id])
+                else:
+                    del self.mods[previous.id]
+                    self.dependency_graph.remove(previous.id)
+                    self.__notify_local_listeners(previous.id, False, None)
+        if mod is not None:
+            self.__notify_local_listeners(mod.id, False, mod)
+
+    def __apply_installed_folder(self, path: str, entry: dict) -> None:
+        """
+        Apply a changed installation folder to the installed mod list.
+        :param path: Path of the installation folder.
+        :param entry: Local index entry of the folder, or None if it was removed.
+        """
+        with self.mods_lock:
+            previous = next((mod for mod in self.installed_mods.values() if mod.installed_dir_path not in [None, ""] and os.path.normpath(mod.installed_dir_path) == os.path.normpath(path)), None)
+            mod = None
+            if entry is not None and entry["data"] is not None:
+                mod = self.parse_mod(entry["data"], image_path=entry["image_path"], install_dir=path)
+                self.installed_mods.pop(mod.id, None)
+                self.update_mod_list([mod], installed=True)
+                mod = self.installed_mods[mod.id]
+            if previous is not None and (mod is None or previous.id != mod.id):
+                del self.installed_mods[previous.id]
+                self.__notify_local_listeners(previous.id, True, None)
+        if mod is not None:
+            self.__notify_local_listeners(mod.id, True, mod)
+
+    def __load_catalog_snapshot(self) -> None:
+        """
+        Load the catalog of the last successful fetch, so remote mods can be listed before (or without) fetching.
+        Mods loaded this way are marked as stale until a fetch confirms them.
+        """
+        if not os.path.exists(self.catalog_snapshot_path):
+            return
+        try:
+            with open(self.catalog_snapshot_path, 'r') as snapshot_file:
+                self.remote_folders = json.loads(snapshot_file.read())
+        except Exception as e:
+            self.log(f"Could not load catalog snapshot. Exception: {e}", is_error=True)
+            return
+
+        mods = []
+        for key, folder in list(self.remote_folders.items()):
+            try:
+                mods.append(self.parse_mod(folder["data"], download_url=folder["url"], image_key=folder.get("image_key"), image_url=folder.get("image_url")))
+            except Exception as e:
+                self.log(str(e), is_error=True)
+                del self.remote_folders[key]
+        self.update_mod_list(mods)
+        for mod in mods:
+            self.mods[mod.id].stale = True
+        self.log(f"Loaded {len(mods)} mods from catalog snapshot.")
 
-    def parse_mod(self, mod_data: dict, download_url: str = None, image: bytes = None, download_dir: str = None, install_dir: str = None) -> Mod:
+    def __save_catalog_snapshot(self) -> None:
+        """
+        Save the catalog of the last successful fetch to disk.
+        """
+        try:
+            os.makedirs(os.path.dirname(self.catalog_snapshot_path), exist_ok=True)
+            with open(self.catalog_snapshot_path + ".tmp", 'w') as snapshot_file:
+                snapshot_file.write(json.dumps(self.remote_folders))
+            os.replace(self.catalog_snapshot_path + ".tmp", self.catalog_snapshot_path)
+        except Exception as e:
+            self.log(f"Could not save catalog snapshot. Exception: {e}", is_error=True)
+
+    def __get_token(self) -> str:
+        """
+        Get the Github token to authenticate with.
+        :return: The token configured in the config, or None if there is none or it was rejected before.
+        """
+        if not self.use_token:
+            return None
+        return self.config.config.get("github_access_token", None) or None
+
+    def parse_mod(self, mod_data: dict, download_url: str = None, image_key: str = None, image_url: str = None, image_path: str = None, download_dir: str = None, install_dir: str = None) -> Mod:
         """
         Parse a mod's data and return a Mod object.
         :param mod_data: Mod's data as dictionary
         :param download_url: URL where the mod can be downloaded from
-        :param image: Bytes object representing the mod's image
+        :param image_key: Key of the mod's image in the image store
+        :param image_url: URL the mod's image can be downloaded from, if it isn't stored yet
+        :param image_path: Path of the mod's image, if the mod is available locally
         :param download_dir: Provided if the mod has already been downloaded
         :param install_dir: Provided if the mod has already been installed
         :return: Parsed Mod object
@@ -89,7 +304,9 @@ class ModManager(Loggable):
             download_url=download_url,
             home_page=home_page,
             repository=repository,
-            image=image,
+            image_key=image_key,
+            image_url=image_url,
+            image_path=image_path,
             modloader_required=modloader_required,
             additional_fields=additional_fields,
             downloaded_dir_path=download_dir,
@@ -145,7 +362,12 @@ class ModManager(Loggable):
                         # If old entry had a download URL and new one doesn't, update new entry with old download URL.
                         self.installed_mods[mod.id].download_url = existing_entry.download_url
                 else:
+                    if existing_entry is not None and existing_entry.downloaded_dir_path in [None, ""] and mod.downloaded_dir_path not in [None, ""] and not mod.compare_version(existing_entry):
+                        # Download is listed after the remote entry (e.g. because local mods were scanned after loading the catalog snapshot)
+                        # --> Check whether the remote entry is newer here instead
+                        mod.update_available = True
                     self.mods[mod.id] = mod
+                    self.dependency_graph.update(mod)
                     if self.mods[mod.id].download_url in [None, ""] and existing_entry is not None:
                         # If old entry had a download URL and new one doesn't, update new entry with old download URL.
                         self.mods[mod.id].download_url = existing_entry.download_url
@@ -159,56 +381,132 @@ class ModManager(Loggable):
                             self.log(f"Update available for installed mod: {mod.id}")
                             self.installed_mods[mod.id].update_available = True
 
-    def fetch_info(self, second_attempt: bool = False) -> bool:
+    def fetch_info(self, second_attempt: bool = False, on_mod=None) -> bool:
         """
         Fetches information on all mods from the configured github repositories.
+        Fetching is done concurrently by the catalog fetcher, using up to "fetch_workers" (config) worker threads.
+        Responses are cached on disk under ./data/cache/, so refetching an unchanged catalog only costs conditional requests.
+        Only mods whose folder changed since the last fetch are parsed again, and mods that were removed from a repository are dropped.
+        Every mod is added to the mod list as soon as it has been fetched, rather than once all of them have been.
+        The resulting catalog is saved as a snapshot, which is loaded (as stale) on the next startup.
         :param second_attempt: Whether or not this is the second attempt already, when retrying after an invalid token was provided. Prevents infinite recursion.
+        :param on_mod: Optional function that is called with every mod as soon as it has been added to (or confirmed in) the mod list. Called from the fetcher's worker threads.
         :return: Whether or not the info refresh was rate limited by Github.
         """
-        mods = []
-        rate_limited = False
-        for repo_id in self.config.config.get("repository_ids", []):
-            try:
-                repo = self.git.get_repo(repo_id)
-                for mod_folder in repo.get_contents("mods"):
-                    try:
-                        mod_url = mod_folder.url
-                        mod_image = None
-                        data = None
-                        self.log(f"Fetching mod from: \"{mod_url}\"")
-                        for file in repo.get_contents(f"mods/{mod_folder.name}"):
-                            if file.name == "info.json":
-                                data = json.loads(file.decoded_content.decode("utf-8"))
-                            if file.name in ["mod.png", "mod.jpg"]:
-                                # TODO: May need to be downloaded through git to prevent rate limiting?
-                                mod_image = requests.get(file.download_url).content
-                                # mod_image = file.decoded_content      # This seems to not handle files that are too large (>1MB)?
-
-                        if data is not None:
-                            mods.append(self.parse_mod(data, download_url=mod_url, image=mod_image))
-                            self.log(f"Parsed new mod: \"{mods[-1].display_name}\"")
-                        else:
-                            self.log(f"Mod found without info.json file. Please report this to the modding community! Mod in question is: \"{mod_folder.name}\"")
-                    except Exception as e:
-                        self.log(str(e), is_error=True)
-            except Exception as e:
-                self.log(str(e), is_error=True)
-                if "403" in str(e):
-                    rate_limited = True
-                if "401" in str(e):
-                    self.git = self.__init_git(False)
-                    if not second_attempt:
-                        self.log("Attempting to refetch without token.")
-                        self.fetch_info(True)
+        self.fetcher.token = self.__get_token()
+        known_shas = {key: folder["sha"] for key, folder in self.remote_folders.items()}
+        fetched = self.fetcher.fetch(self.config.config.get("repository_ids", []), known_shas=known_shas, on_entry=lambda entry: self.__publish_entry(entry, on_mod))
 
-        self.update_mod_list(mods)
+        if self.fetcher.unauthorised:
+            self.use_token = False
+            if not second_attempt:
+                self.log("Attempting to refetch without token.")
+                return self.fetch_info(True, on_mod=on_mod)
+
+        if self.fetcher.cancelled.is_set():
+            return not self.fetcher.rate_limited
+
+        # Folders that were not listed by a repository that was fetched successfully have been removed upstream.
+        # Folders that could not be fetched keep their previous entry (and tree SHA), so they are fetched again next time.
+        fetched_keys = set(entry["key"] for entry in fetched) | self.fetcher.failed_keys
+        with self.mods_lock:
+            for key in list(self.remote_folders.keys()):
+                if key not in fetched_keys and self.remote_folders[key]["repo_id"] in self.fetcher.fetched_repositories:
+                    self.__drop_remote_mod(self.remote_folders.pop(key)["id"])
+
+        self.__save_catalog_snapshot()
+        self.transport.log_stats()
+
+        return not self.fetcher.rate_limited
 
-        return not rate_limited
+    def __publish_entry(self, entry: dict, on_mod=None) -> None:
+        """
+        Add a mod entry that has just been fetched to the mod list. Called from the fetcher's worker threads.
+        Changed entries are parsed and merged into the mod list; unchanged entries only have their mod marked as fresh.
+        :param entry: Mod entry as returned by the catalog fetcher.
+        :param on_mod: Optional function to call with the resulting mod.
+        """
+        with self.mods_lock:
+            if entry["unchanged"]:
+                folder = self.remote_folders.get(entry["key"], None)
+                mod = self.mods.get(folder["id"], None) if folder is not None else None
+                if mod is None:
+                    return
+                mod.stale = False
+            else:
+                try:
+                    mod = self.parse_mod(entry["data"], download_url=entry["url"], image_key=entry.get("image_key"), image_url=entry.get("image_url"))
+                    self.log(f"Parsed new mod: \"{mod.display_name}\"")
+                except Exception as e:
+                    self.log(str(e), is_error=True)
+                    return
+                previous_folder = self.remote_folders.get(entry["key"], None)
+                if previous_folder is not None and previous_folder["id"] != mod.id:
+                    self.__drop_remote_mod(previous_folder["id"])
+                self.remote_folders[entry["key"]] = {
+                    "sha": entry["sha"],
+                    "id": mod.id,
+                    "repo_id": entry["repo_id"],
+                    "branch": entry["branch"],
+                    "name": entry["name"],
+                    "data": entry["data"],
+                    "url": entry["url"],
+                    "image_key": entry.get("image_key"),
+                    "image_url": entry.get("image_url")
+                }
+                self.update_mod_list([mod])
+                mod = self.mods[mod.id]
+
+        if on_mod is not None:
+            on_mod(mod)
+
+    def __drop_remote_mod(self, mod_id: str) -> None:
+        """
+        Drop a mod that is no longer available in its repository from the mod list.
+        Downloaded mods are kept, since they are still available locally.
+        :param mod_id: Mod id of the mod to drop.
+        """
+        mod = self.mods.get(mod_id, None)
+        if mod is None or mod.downloaded_dir_path not in [None, ""]:
+            return
+        self.log(f"Mod was removed from its repository: \"{mod_id}\"")
+        del self.mods[mod_id]
+        self.dependency_graph.remove(mod_id)
 
-    def download_mod(self, mod_id) -> bool:
+    def cancel_fetch(self) -> None:
+        """
+        Cancel a running fetch_info call.
+        Mods that were fetched before the cancel stay in the mod list, with their new information, and no further mods are added. The catalog is incomplete, so no mods are dropped and no snapshot is saved.
+        The fetch's requests (listings and metadata) that are still waiting for their turn (or for the rate limit to reset) are cancelled as well. Waiting downloads and image loads are not affected.
+        """
+        self.fetcher.cancel()
+        self.scheduler.cancel_waiting(priorities=[PRIORITY_LISTING, PRIORITY_METADATA])
+
+    def get_rate_limit_status(self) -> dict:
+        """
+        Get the remaining Github API budget and the progress of queued requests.
+        :return: Dictionary as returned by RequestScheduler.get_status.
+        """
+        return self.scheduler.get_status()
+
+    def __mod_lock(self, mod_id: str) -> RLock:
+        """
+        Get the lock that serialises downloads and updates of a mod, so two of them never work on the same staging and partial files at once.
+        :param mod_id: Mod id of the mod.
+        :return: The mod's lock.
+        """
+        with self.mod_locks_lock:
+            return self.mod_locks.setdefault(mod_id, RLock())
+
+    def download_mod(self, mod_id, progress=None, cancel_event=None, refresh: bool = True) -> bool:
         """
         Downloads a mod via its given mod_id.
+        Blocks until the download has finished; use queue_download to download in the background.
+        Waits for other downloads and updates of the same mod to finish first.
         :param mod_id: Mod id of the mod to download
+        :param progress: Optional function that is called with (bytes done, bytes total) while the mod is downloading
+        :param cancel_event: Optional event that cancels the download when set
+        :param refresh: Whether or not to schedule a refresh of the downloaded mods afterwards. Batch operations refresh once at the end instead.
         :return: Whether or not the download was successful
         """
         self.log(f"Attempting to download mod: \"{mod_id}\"")
@@ -222,25 +520,135 @@ class ModManager(Loggable):
         if downloads_dir[-1] != "/":
             downloads_dir += "/"
 
+        stats = dict()
         try:
-            download_result = mod.download(downloads_dir)
+            with self.__mod_lock(mod_id):
+                download_result = mod.download(downloads_dir, transport=self.transport, max_workers=self.config.config.get("download_workers", 4), progress=progress, cancel_event=cancel_event, file_store=self.file_store, stats=stats, cleaner=self.cleaner, scheduler=self.scheduler)
         except Exception as e:
             self.log(f"Mod download failed. Exception: {e}", is_error=True)
             return False
 
         if download_result:
-            self.log("Mod downloaded successfully.")
-            self.__refresh_downloaded_mods()
+            self.log(f"Mod downloaded successfully. Downloaded {stats.get('downloaded', 0)} bytes, {stats.get('reused', 0)} bytes saved by reusing unchanged files.")
+            if refresh:
+                self.refresh_scheduler.invalidate(REFRESH_DOWNLOADS)
+                self.file_store.collect_garbage()
             return True
         else:
             self.log("Mod download failed.")
             return False
 
+    def download_mods_from_archive(self, mod_ids: list[str] = None, ref: str = None, progress=None, cancel_event=None) -> bool:
+        """
+        Download mods in bulk, extracting them from their repository's archive rather than downloading them file by file.
+        Costs a single request per repository, which makes downloading many (or all) mods at once a lot faster.
+        Every mod's folder is extracted and swapped into place while holding the mod's lock, so it never overlaps with a single mod download or update of the same mod.
+        :param mod_ids: Mod ids of the mods to download. Downloads every remote mod if not given.
+        :param ref: Branch, tag or commit SHA to download the archives at. Defaults to the branch each mod was fetched from.
+        :param progress: Optional function that is called with (bytes done, bytes total) while an archive is downloading
+        :param cancel_event: Optional event that cancels the download when set
+        :return: Whether or not all requested mods were downloaded
+        """
+        downloads_dir = self.config.config.get("downloads_directory", "")
+        if downloads_dir in [None, ""]:
+            return False
+        if downloads_dir[-1] != "/":
+            downloads_dir += "/"
+
+        # Group the requested folders by the archive they can be extracted from.
+        archives: dict[tuple, list[str]] = dict()
+        locks: dict[str, RLock] = dict()
+        with self.mods_lock:
+            for key, folder in self.remote_folders.items():
+                if mod_ids is not None and folder["id"] not in mod_ids:
+                    continue
+                name = folder.get("name", key.rsplit("/", 1)[-1])
+                branch = folder.get("branch", folder["url"].rsplit("?ref=", 1)[-1])
+                archives.setdefault((folder["repo_id"], ref or branch), []).append(name)
+                locks[name] = self.__mod_lock(folder["id"])
+        requested = sum(len(folder_names) for folder_names in archives.values())
+        if requested == 0:
+            self.log("No remote mods to download from an archive.")
+            return False
+
+        self.archive_downloader.token = self.__get_token()
+        os.makedirs(downloads_dir, exist_ok=True)
+        extracted = 0
+        try:
+            for (repo_id, archive_ref), folder_names in archives.items():
+                extracted += len(self.archive_downloader.download(repo_id, archive_ref, folder_names, downloads_dir, progress=progress, cancel_event=cancel_event, locks=locks))
+        except Exception as e:
+            self.log(f"Archive download failed. Exception: {e}", is_error=True)
+            return False
+        finally:
+            self.refresh_scheduler.invalidate(REFRESH_DOWNLOADS)
+            self.file_store.collect_garbage()
+
+        self.log(f"Downloaded {extracted} of {requested} mods from repository archives.")
+        return extracted == requested
+
+    def queue_archive_download(self, mod_ids: list[str] = None, priority: int = 0) -> DownloadJob:
+        """
+        Queue a bulk download of mods from their repository archives.
+        :param mod_ids: Mod ids of the mods to download. Downloads every remote mod if not given.
+        :param priority: Priority of the download. Lower runs first.
+        :return: The queued download job.
+        """
+        return self.download_queue.submit("all mods" if mod_ids is None else ", ".join(mod_ids), lambda progress, cancel_event: self.download_mods_from_archive(mod_ids, progress=progress, cancel_event=cancel_event), kind="archive download", priority=priority)
+
+    def queue_download(self, mod_id: str, priority: int = 0) -> DownloadJob:
+        """
+        Queue a mod to be downloaded by the download queue.
+        :param mod_id: Mod id of the mod to download
+        :param priority: Priority of the download. Lower runs first.
+        :return: The queued download job.
+        """
+        return self.download_queue.submit(mod_id, lambda progress, cancel_event: self.download_mod(mod_id, progress=progress, cancel_event=cancel_event), kind="download", priority=priority)
+
+    def queue_install(self, mod_id: str, priority: int = 0) -> DownloadJob:
+        """
+        Queue a mod to be installed (together with its missing requirements) by the download queue.
+        The returned job coordinates the installation; every mod is downloaded and installed by a job of its own.
+        :param mod_id: Mod id of the mod to install
+        :param priority: Priority of the installation. Lower runs first.
+        :return: The queued install job.
+        """
+        return self.download_queue.submit(mod_id, lambda progress, cancel_event: all(self.install_many([mod_id], cancel_event=cancel_event).values()), kind="install", priority=priority, coordinator=True)
+
+    def queue_update(self, mod_id: str, priority: int = 0) -> DownloadJob:
+        """
+        Queue a mod to be updated by the download queue.
+        Installed mods are only downloaded again if their remote version is newer than their download, like update_all does; otherwise they are updated from the download they already have.
+        :param mod_id: Mod id of the mod to update
+        :param priority: Priority of the update. Lower runs first.
+        :return: The queued update job.
+        """
+        return self.download_queue.submit(mod_id, lambda progress, cancel_event: self.update_mod(mod_id, update_install=None, download_first=getattr(self.mods.get(mod_id, None), "update_available", False), progress=progress, cancel_event=cancel_event), kind="update", priority=priority)
+
+    def queue_uninstall(self, mod_id: str, priority: int = 0) -> DownloadJob:
+        """
+        Queue a mod to be uninstalled by the download queue, so it never waits for a rescan on the calling thread.
+        :param mod_id: Mod id of the mod to uninstall
+        :param priority: Priority of the uninstallation. Lower runs first.
+        :return: The queued uninstall job.
+        """
+        return self.download_queue.submit(mod_id, lambda progress, cancel_event: self.uninstall_mod(mod_id), kind="uninstall", priority=priority)
+
+    def cancel_job(self, job_id: int) -> bool:
+        """
+        Cancel a queued or running download queue job.
+        :param job_id: Id of the job to cancel
+        :return: Whether or not there was an unfinished job to cancel.
+        """
+        return self.download_queue.cancel(job_id)
+
     def clear_mods(self) -> None:
         """
         Clear mod dictionary.
         """
         self.mods.clear()
+        self.remote_folders.clear()
+        self.dependency_graph.clear()
 
     def refresh(self, clear: bool = True) -> None:
         """
@@ -249,8 +657,8 @@ class ModManager(Loggable):
         """
         if clear:
             self.clear_mods()
-        self.__refresh_downloaded_mods()
-        self.__refresh_installed_mods()
+        self.refresh_scheduler.invalidate(REFRESH_DOWNLOADS, REFRESH_MODS)
+        self.refresh_scheduler.flush()
         self.fetch_info()
 
     def add_filter_tag(self, tag: str) -> None:
@@ -330,7 +738,25 @@ class ModManager(Loggable):
         """
         return sorted(mods, key=lambda mod: mod.display_name)
 
-    def refresh_local_mods(self, directory: str, downloaded: bool = False, installed: bool = False) -> list[Mod]:
+    def wait_for_local_scan(self, timeout: float = None) -> bool:
+        """
+        Block until the local mods have been scanned on startup.
+        :param timeout: Maximum amount of seconds to wait. Waits indefinitely if not given.
+        :return: Whether or not the scan has finished.
+        """
+        return self.local_scan_done.wait(timeout)
+
+    def refresh_local_mods(self, directory: str, downloaded: bool = False, installed: bool = False, progress=None, force: bool = False) -> list[Mod]:
+        """
+        Scan a local directory for mods, and merge them into the downloaded or installed mod list.
+        Only folders that changed since the last scan are read again, unless forced.
+        :param directory: Directory to scan.
+        :param downloaded: Whether or not the directory holds downloaded mods.
+        :param installed: Whether or not the directory holds installed mods. The installed mod list is replaced by the mods found.
+        :param progress: Optional function that is called with (folders done, folders total) while scanning.
+        :param force: Whether or not to read every folder again, even the ones that didn't change.
+        :return: List of mods found.
+        """
         mods = []
         if directory in [None, ""]:
             self.log("Tried to refresh from local mods directory without a directory being given.", is_error=True)
@@ -343,45 +769,56 @@ class ModManager(Loggable):
             self.log("Tried to refresh from local mods directory with invalid directory specified. This could be because you haven't downloaded any mods yet, or because you don't have a mods folder in the Sailwind directory.", is_error=True)
             return mods
 
-        for local_mod_dir in [os.path.join(directory, mod_dir_name) for mod_dir_name in filter(lambda x: os.path.isdir(os.path.join(directory, x)), os.listdir(directory))]:
+        if installed:
+            # Only links into the downloads directory were made by the manager; other links belong to the user and are left alone.
+            downloads_dir = os.path.abspath(self.config.config.get("downloads_directory", None) or "")
+            for link_name in filter(lambda x: os.path.islink(os.path.join(directory, x)) and not os.path.exists(os.path.join(directory, x)), os.listdir(directory)):
+                link_target = os.path.abspath(os.path.join(directory, os.readlink(os.path.join(directory, link_name))))
+                if os.path.dirname(link_target) != downloads_dir:
+                    continue
+                self.log(f"Installed mod \"{link_name}\" is symlinked to a download that no longer exists. Removing its link.", is_error=True)
+                os.unlink(os.path.join(directory, link_name))
+
+        try:
+            local_mods = self.local_index.scan(directory, progress=progress, force=force)
+        except Exception as e:
+            self.log(f"Could not scan local mods directory \"{directory}\". Exception: {e}", is_error=True)
+            return mods
+
+        for local_mod in local_mods:
             try:
-                mod_image = None
-                data = None
-                self.log(f"Fetching local mod from: \"{local_mod_dir}\"")
-                for file in os.listdir(local_mod_dir):
-                    if file == "info.json":
-                        info_file = open(os.path.join(local_mod_dir, file), 'r')
-                        data = json.loads(info_file.read())
-                        info_file.close()
-                    if file in ["mod.png", "mod.jpg"]:
-                        image_file = open(os.path.join(local_mod_dir, file), 'rb')
-                        mod_image = image_file.read()
-                        image_file.close()
-
-                if data is not None:
+                if local_mod["data"] is not None:
                     download_dir = None
                     install_dir = None
                     if downloaded:
-                        download_dir = local_mod_dir
+                        download_dir = local_mod["path"]
                     if installed:
-                        install_dir = local_mod_dir
-                    mods.append(self.parse_mod(data, image=mod_image, download_dir=download_dir, install_dir=install_dir))
+                        install_dir = local_mod["path"]
+                    mods.append(self.parse_mod(local_mod["data"], image_path=local_mod["image_path"], download_dir=download_dir, install_dir=install_dir))
                     self.log(f"Parsed new mod: \"{mods[-1].display_name}\"")
                 else:
-                    self.log(f"Mod found without info.json file. Please report this to the modding community! Mod in question is: \"{local_mod_dir}\"")
+                    self.log(f"Mod found without info.json file. Please report this to the modding community! Mod in question is: \"{local_mod['path']}\"")
             except Exception as e:
                 self.log(str(e), is_error=True)
 
-        self.update_mod_list(mods, installed=installed)
+        self.local_index.save()
+
+        with self.mods_lock:
+            if installed:
+                # Replaced as a whole, so mods that were uninstalled disappear from the list.
+                self.installed_mods.clear()
+            self.update_mod_list(mods, installed=installed)
+        return mods
 
-    def __refresh_downloaded_mods(self):
+    def __refresh_downloaded_mods(self, progress=None, force: bool = False):
         downloaded_dir = self.config.config.get("downloads_directory", None)
-        self.refresh_local_mods(downloaded_dir, downloaded=True)
+        self.refresh_local_mods(downloaded_dir, downloaded=True, progress=progress, force=force)
 
-    def __refresh_installed_mods(self):
+    def __refresh_installed_mods(self, progress=None, force: bool = False):
         installed_dir = self.config.config.get("mods_directory", None)
-        self.installed_mods.clear()
-        self.refresh_local_mods(installed_dir, installed=True)
+        if installed_dir in [None, ""] or not os.path.exists(installed_dir):
+            self.installed_mods.clear()
+        self.refresh_local_mods(installed_dir, installed=True, progress=progress, force=force)
 
     def get_mod(self, mod_id: str) -> Mod:
         """
@@ -391,6 +828,44 @@ class ModManager(Loggable):
         """
         return self.mods.get(mod_id, None)
 
+    def prefetch_image(self, mod: Mod) -> None:
+        """
+        Make sure a remote mod's image is in the image store, downloading it if necessary.
+        Does nothing for local images, since those are read straight from disk.
+        Blocks on the download, so should not be called from the GUI thread.
+        :param mod: Mod to prefetch the image of.
+        """
+        if mod.image_path not in [None, ""] or mod.image_key in [None, ""] or mod.image_url in [None, ""]:
+            return
+        if self.image_store.contains(mod.image_key):
+            return
+        try:
+            self.log(f"Downloading image of mod: \"{mod.id}\"", is_verbose=True)
+            response = self.scheduler.get(mod.image_url, priority=PRIORITY_IMAGE)
+            response.raise_for_status()
+            self.image_store.put(response.content, key=mod.image_key)
+            self.image_store.save()
+        except Exception as e:
+            self.log(f"Could not download image of mod \"{mod.id}\". Exception: {e}", is_error=True)
+
+    def get_image(self, mod: Mod) -> bytes:
+        """
+        Get a mod's image. Local images are read from disk, remote ones from the image store (downloading them first if necessary).
+        Blocks on disk & network access, so should not be called from the GUI thread.
+        :param mod: Mod to get the image of.
+        :return: The image's bytes, or None if the mod has no image or it could not be loaded.
+        """
+        if mod.image_path not in [None, ""]:
+            try:
+                # Local images are only read here, when they are displayed; scans only record their path.
+                with open(mod.image_path, 'rb') as image_file:
+                    return image_file.read() or None
+            except Exception as e:
+                self.log(f"Could not read image of mod \"{mod.id}\". Exception: {e}", is_error=True)
+                return None
+        self.prefetch_image(mod)
+        return self.image_store.get(mod.image_key)
+
     def get_mods(self) -> list[Mod]:
         """
         Get list of fetched & filtered mods. Does not re-fetch from repos.
@@ -406,11 +881,12 @@ class ModManager(Loggable):
     def get_installed_mods(self, refresh: bool = True) -> list[Mod]:
         """
         Get list of installed mods.
-        :param refresh: Whether or not to check the mods directory again for changes.
-        :return: List of installed mods.
+        Never blocks: a requested rescan runs in the background, and the refresh scheduler's listeners are notified once it is done.
+        :param refresh: Whether or not to schedule a rescan of the mods directory. Every installed mod is parsed again, so files that were changed in place are picked up as well.
+        :return: List of installed mods, as of the last scan.
         """
         if refresh:
-            self.__refresh_installed_mods()
+            self.refresh_scheduler.invalidate(REFRESH_MODS, force=True)
 
         mods = list(self.installed_mods.values())
 
@@ -421,12 +897,37 @@ class ModManager(Loggable):
 
         return installed_mods
 
-    def install_mod(self, mod_id: str) -> bool:
+    def get_install_strategy(self) -> str:
+        """
+        Get the configured install strategy ("install_strategy" in the config).
+        :return: One of INSTALL_STRATEGIES. Defaults to copying if no strategy is configured or the configured strategy is unknown.
+        """
+        strategy = self.config.config.get("install_strategy", INSTALL_COPY)
+        if strategy not in INSTALL_STRATEGIES:
+            self.log(f"Unknown install strategy \"{strategy}\", using \"{INSTALL_COPY}\" instead.", is_error=True)
+            return INSTALL_COPY
+        return strategy
+
+    def install_mod(self, mod_id: str, strategy: str = None, refresh: bool = True, resolve_dependencies: bool = True) -> bool:
         """
-        Copy a mod from the downloads dir to the installation dir.
+        Install a mod from the downloads dir to the installation dir.
+        Depending on the install strategy, the mod's files are copied, hard linked from the download (and thereby the file store), or the mod's directory is symlinked to the download.
+        Linking falls back to copying (or hard linking, for symlinks) where it isn't possible, e.g. across filesystems or without the required privileges.
+        Symlinked installs follow the download, so updating the download updates the installed mod as well.
+        Requirements of the mod that aren't installed yet are downloaded and installed first, in parallel waves.
         :param mod_id: Mod id of the mod to install
+        :param strategy: Install strategy to use. Defaults to the configured strategy.
+        :param refresh: Whether or not to schedule a refresh of the installed mods afterwards. Batch operations refresh once at the end instead.
+        :param resolve_dependencies: Whether or not to install the mod's missing requirements as well.
         :return: Whether or not the installation was successful.
         """
+        if resolve_dependencies:
+            plan = self.resolve_install_plan([mod_id])
+            if not plan.ok:
+                return False
+            if plan.mod_ids not in [[], [mod_id]]:
+                return all(self.install_many([mod_id]).values())
+
         installed_dir = self.config.config.get("mods_directory", None)
 
         if installed_dir in [None, ""]:
@@ -451,59 +952,337 @@ class ModManager(Loggable):
             return False
 
         if mod_to_install.installed_dir_path not in [None, ""]:
-            if os.path.exists(mod_to_install.installed_dir_path):
+            if os.path.lexists(mod_to_install.installed_dir_path):
                 self.log("Mod is already installed. Please ensure that there are no leftover files of this mod in the mods directory. Please report this.")
                 return False
 
-        folder_name = mod_downloaded_dir.split("/")[-1]
+        folder_name = mod_downloaded_dir.rstrip("/").split("/")[-1]
 
-        if os.path.exists(f"{installed_dir}/{folder_name}"):
+        if os.path.lexists(f"{installed_dir}/{folder_name}"):
             self.log("Mod is already installed. Please ensure that there are no leftover files of this mod in the mods directory.")
             return False
 
-        copytree(mod_downloaded_dir, f"{installed_dir}/{folder_name}")
+        strategy = strategy or self.get_install_strategy()
+        if strategy == INSTALL_SYMLINK:
+            try:
+                os.symlink(os.path.abspath(mod_downloaded_dir), f"{installed_dir}/{folder_name}", target_is_directory=True)
+            except OSError as e:
+                self.log(f"Could not symlink mod, hard linking its files instead. Exception: {e}", is_error=True)
+                strategy = INSTALL_HARDLINK
+        if strategy == INSTALL_HARDLINK:
+            copytree(mod_downloaded_dir, f"{installed_dir}/{folder_name}", copy_function=self.file_store.link_file)
+        elif strategy == INSTALL_COPY:
+            copytree(mod_downloaded_dir, f"{installed_dir}/{folder_name}")
 
-        self.log(f"Mod installed in directory: {installed_dir}/{folder_name}")
+        self.log(f"Mod installed in directory ({strategy}): {installed_dir}/{folder_name}")
 
-        self.__refresh_installed_mods()
+        if refresh:
+            self.refresh_scheduler.invalidate(REFRESH_MODS)
 
         return True
 
-    def uninstall_mod(self, mod_id: str) -> bool:
+    def __install_staging_dir(self, create: bool = True) -> str:
+        """
+        Get the directory that new versions of installed mods are prepared in, and that old versions are moved to before they are deleted.
+        It lies next to the game's mods directory rather than in it, since the game's mod loader would load anything left behind in the mods directory as a duplicate mod.
+        Falls back to the mods directory itself if the directory next to it is on another volume, since folders can't be renamed across volumes.
+        :param create: Whether or not to create the directory. If not, it isn't checked either.
+        :return: Path of the directory, or None if no mods directory is configured.
+        """
+        installed_dir = self.config.config.get("mods_directory", None)
+        if installed_dir in [None, ""]:
+            return None
+        installed_dir = os.path.normpath(os.path.abspath(installed_dir))
+        staging_dir = os.path.join(os.path.dirname(installed_dir), TRASH_DIRECTORY)
+        if not create:
+            return staging_dir
+        try:
+            os.makedirs(staging_dir, exist_ok=True)
+            if os.stat(staging_dir).st_dev == os.stat(installed_dir).st_dev:
+                return staging_dir
+            self.log(f"\"{staging_dir}\" is on another volume than the mods directory, updating mods inside the mods directory instead.", is_error=True)
+        except OSError as e:
+            self.log(f"Could not create \"{staging_dir}\", updating mods inside the mods directory instead. Exception: {e}", is_error=True)
+        return installed_dir
+
+    def __remove_installed_dir(self, path: str) -> None:
+        """
+        Remove an installed mod's directory. Symlinked installs only have their link removed, leaving the download untouched.
+        Other directories are moved out of the mods directory and deleted in the background.
+        :param path: Installed mod directory to remove.
+        """
+        path = path.rstrip("/")
+        if os.path.islink(path):
+            os.unlink(path)
+        else:
+            folder_name = os.path.basename(path)
+            old_path = os.path.join(self.__install_staging_dir(), f".{folder_name}{OLD_DIRECTORY_MARKER}-{time.time_ns()}")
+            os.replace(path, old_path)
+            self.cleaner.schedule(old_path)
+
+    def uninstall_mod(self, mod_id: str, refresh: bool = True) -> bool:
         """
         Remove a mod from the installation dir.
+        Symlinked and hard linked installs only remove their links; the downloaded files are kept.
         :param mod_id: Mod id of the mod to uninstall
+        :param refresh: Whether or not to schedule a refresh of the installed mods afterwards. Batch operations refresh once at the end instead.
         :return: Whether or not the uninstallation was successful.
         """
+        # Make sure an installation that was just made is listed.
+        self.refresh_scheduler.flush()
         installed_mod = self.installed_mods.get(mod_id, None)
         if installed_mod is None:
             self.log("Could not uninstall mod since it wasn't found in the installed mod list.")
             return False
-        if os.path.exists(installed_mod.installed_dir_path):
+        if os.path.lexists(installed_mod.installed_dir_path):
             self.log(f"Uninstalling mod from {installed_mod.installed_dir_path}")
-            rmtree(installed_mod.installed_dir_path)
-            self.__refresh_installed_mods()
+            self.__remove_installed_dir(installed_mod.installed_dir_path)
+            if refresh:
+                self.refresh_scheduler.invalidate(REFRESH_MODS)
+                self.file_store.collect_garbage()
             return True
         else:
             self.log("Could not uninstall mod since the installed path wasn't found. Please report this.")
             return False
 
-    def update_mod(self, mod_id: str, update_install: bool = True, download_first: bool = False) -> bool:
+    def update_mod(self, mod_id: str, update_install: bool = True, download_first: bool = False, progress=None, cancel_event=None, refresh: bool = True) -> bool:
         """
         Update a mod.
-        :param mod_id: Mod id of the mod to uninstall
-        :param update_install: Whether or not to update the installed mod as well
+        Installed mods are updated in place, replacing only the files that changed since they were installed.
+        Waits for other downloads and updates of the same mod to finish first.
+        :param mod_id: Mod id of the mod to update
+        :param update_install: Whether or not to update the installed mod as well. If None, the installed mod is updated only if the mod is installed.
         :param download_first: Whether or not to force a new download first before updating the installed mod. Generally only useful if you're updating both the download *and* the installed mod at the same time.
+        :param progress: Optional function that is called with (bytes done, bytes total) while the mod is downloading
+        :param cancel_event: Optional event that cancels the download when set
+        :param refresh: Whether or not to schedule a refresh of the local mods afterwards. Batch operations refresh once at the end instead.
         :return: Whether or not the update was successful.
         """
+        # Make sure an installation that was just made is listed.
+        self.refresh_scheduler.flush()
+        if update_install is None:
+            update_install = mod_id in self.installed_mods
+
         if update_install:
-            success = True
-            if download_first:
-                success = self.download_mod(mod_id)
-            success = success and self.install_mod(mod_id)
-            self.__refresh_installed_mods()
+            # Held across the download and the update of the installed mod, so a second update of the same mod waits for this one.
+            with self.__mod_lock(mod_id):
+                success = True
+                if download_first:
+                    # Refreshed together with the installed mods below, so listeners are told once.
+                    success = self.download_mod(mod_id, progress=progress, cancel_event=cancel_event, refresh=False)
+                installed_mod = self.installed_mods.get(mod_id, None)
+                is_installed = installed_mod is not None and installed_mod.installed_dir_path not in [None, ""] and os.path.exists(installed_mod.installed_dir_path)
+                if is_installed:
+                    success = success and self.__sync_installed_mod(mod_id)
+            if not is_installed:
+                # Outside of the mod's lock, since installing the mod's requirements may download the mod on another thread.
+                # Batches (refresh=False) resolve requirements for the whole batch up front.
+                success = success and self.install_mod(mod_id, refresh=refresh, resolve_dependencies=refresh)
+            if refresh:
+                self.refresh_scheduler.invalidate(*([REFRESH_DOWNLOADS, REFRESH_MODS] if download_first else [REFRESH_MODS]))
+                if download_first:
+                    self.file_store.collect_garbage()
 
         else:
-            success = self.download_mod(mod_id)
+            success = self.download_mod(mod_id, progress=progress, cancel_event=cancel_event, refresh=refresh)
 
         return success
+
+    def resolve_install_plan(self, mod_ids: list[str]) -> InstallPlan:
+        """
+        Resolve which mods have to be installed (and in which order) to install the given mods with all of their requirements.
+        Missing requirements, outdated requirements, cycles and conflicts are logged.
+        :param mod_ids: Mod ids of the mods to install
+        :return: The install plan.
+        """
+        self.wait_for_local_scan()
+        self.refresh_scheduler.flush()
+        plan = self.dependency_graph.resolve(mod_ids, installed=set(self.installed_mods.keys()))
+        for missing_id, required_by in plan.missing.items():
+            if len(required_by) > 0:
+                self.log(f"Required mod \"{missing_id}\" was not found. Required by: {', '.join(required_by)}", is_error=True)
+        for mod_id, requirement_id, minimum_version in plan.outdated:
+            self.log(f"Mod \"{mod_id}\" requires version {minimum_version} of \"{requirement_id}\", which is not available yet.", is_error=True)
+        if len(plan.cycles) > 0:
+            self.log(f"Mods require each other in a cycle, installing them together: {', '.join(plan.cycles)}")
+        for mod_id, incompatible_id in plan.conflicts:
+            self.log(f"Mod \"{mod_id}\" is incompatible with \"{incompatible_id}\". Aborting installation.", is_error=True)
+        return plan
+
+    def install_many(self, mod_ids: list[str], cancel_event=None) -> dict[str, bool]:
+        """
+        Install several mods at once, together with their missing requirements, downloading the ones that haven't been downloaded yet first.
+        Mods are installed in waves, in dependency order; the mods within a wave are installed in parallel, as download queue jobs.
+        :param mod_ids: Mod ids of the mods to install
+        :param cancel_event: Optional event that cancels the remaining installations when set
+        :return: Dictionary of mod id to whether or not it was installed successfully. Includes the requirements that were installed.
+        """
+        install_plan = self.resolve_install_plan(mod_ids)
+        if not install_plan.ok:
+            return {mod_id: False for mod_id in mod_ids}
+
+        plan = dict()
+        for mod_id in install_plan.mod_ids:
+            mod = self.mods.get(mod_id, None)
+            download_first = mod is not None and mod.downloaded_dir_path in [None, ""]
+            plan[mod_id] = lambda progress, job_cancel_event, mod_id=mod_id, download_first=download_first: (not download_first or self.download_mod(mod_id, progress=progress, cancel_event=job_cancel_event, refresh=False)) and self.install_mod(mod_id, refresh=False, resolve_dependencies=False)
+        report = self.__run_batch("Install", plan, waves=install_plan.waves, cancel_event=cancel_event)
+        for mod_id in mod_ids:
+            report.setdefault(mod_id, mod_id in self.installed_mods)
+        return report
+
+    def uninstall_many(self, mod_ids: list[str]) -> dict[str, bool]:
+        """
+        Uninstall several mods at once.
+        :param mod_ids: Mod ids of the mods to uninstall
+        :return: Dictionary of mod id to whether or not it was uninstalled successfully.
+        """
+        return self.__run_batch("Uninstall", {mod_id: lambda progress, job_cancel_event, mod_id=mod_id: self.uninstall_mod(mod_id, refresh=False) for mod_id in mod_ids})
+
+    def update_all(self, cancel_event=None) -> dict[str, bool]:
+        """
+        Update every installed mod that has an update available.
+        Mods whose remote version is newer than their download are downloaded again first; the installed mods are then updated from their downloads. Every mod is updated by a download queue job of its own.
+        :param cancel_event: Optional event that cancels the remaining updates when set
+        :return: Dictionary of mod id to whether or not it was updated successfully. Mods that were up-to-date are left out.
+        """
+        self.wait_for_local_scan()
+        self.refresh_scheduler.flush()
+        plan = dict()
+        for mod_id, installed_mod in self.installed_mods.items():
+            mod = self.mods.get(mod_id, None)
+            download_first = mod is not None and mod.update_available
+            if not download_first and not installed_mod.update_available:
+                continue
+            plan[mod_id] = lambda progress, job_cancel_event, mod_id=mod_id, download_first=download_first: self.update_mod(mod_id, update_install=True, download_first=download_first, progress=progress, cancel_event=job_cancel_event, refresh=False)
+        return self.__run_batch("Update", plan, cancel_event=cancel_event)
+
+    def queue_update_all(self, priority: int = 0) -> DownloadJob:
+        """
+        Queue an update of every installed mod that has an update available.
+        :param priority: Priority of the update. Lower runs first.
+        :return: The queued update job.
+        """
+        return self.download_queue.submit("all mods", lambda progress, cancel_event: all(self.update_all(cancel_event=cancel_event).values()), kind="update all", priority=priority, coordinator=True)
+
+    def __run_batch(self, action: str, plan: dict, waves: list[list[str]] = None, cancel_event=None) -> dict[str, bool]:
+        """
+        Run the operations of a batch as download queue jobs, one per mod, and refresh the local mods once they are all done.
+        The jobs share the queue's "max_concurrent_downloads" (config) workers with every other job, so a batch never runs more operations at once than the queue allows.
+        Batches started on one of the queue's workers (e.g. an update that installs a mod's requirements) run their operations one by one on that worker instead, since a worker must never wait for other jobs.
+        :param action: Name of the batch's action, for logging.
+        :param plan: Dictionary of mod id to a function that performs the action for that mod. Called with a progress function and a cancel event, like a download queue job's function, and returns whether or not it was successful.
+        :param waves: Optional groups of mod ids to run one after the other. Mods that require a mod that failed in an earlier wave are skipped. Runs everything at once if not given.
+        :param cancel_event: Optional event that cancels the batch's remaining operations when set.
+        :return: Dictionary of mod id to whether or not the action was successful.
+        """
+        report = dict()
+        if len(plan) == 0:
+            self.log(f"{action}: nothing to do.")
+            return report
+
+        def run(mod_id: str) -> bool:
+            try:
+                return bool(plan[mod_id](None, cancel_event))
+            except Exception as e:
+                self.log(f"{action} of mod \"{mod_id}\" failed. Exception: {e}", is_error=True)
+                return False
+
+        for wave in waves or [list(plan)]:
+            failed = set(mod_id for mod_id, success in report.items() if not success)
+            for mod_id in [mod_id for mod_id in wave if len(failed.intersection(self.dependency_graph.requirements.get(mod_id, dict()))) > 0]:
+                self.log(f"{action} of mod \"{mod_id}\" skipped, since one of its requirements failed.", is_error=True)
+                report[mod_id] = False
+            wave = [mod_id for mod_id in wave if mod_id not in report]
+            if cancel_event is not None and cancel_event.is_set():
+                report.update((mod_id, False) for mod_id in wave)
+                continue
+
+            if self.download_queue.is_worker():
+                for mod_id in wave:
+                    report[mod_id] = run(mod_id)
+                continue
+
+            jobs = {mod_id: self.download_queue.submit(mod_id, plan[mod_id], kind=action.lower()) for mod_id in wave}
+            for mod_id, job in jobs.items():
+                while not job.wait(0.1):
+                    if cancel_event is not None and cancel_event.is_set() and not job.cancel_event.is_set():
+                        self.download_queue.cancel(job.id)
+                report[mod_id] = job.status == JOB_DONE
+
+        self.refresh_scheduler.invalidate(REFRESH_DOWNLOADS, REFRESH_MODS)
+        self.refresh_scheduler.flush()
+        self.file_store.collect_garbage()
+
+        failed = [mod_id for mod_id, success in report.items() if not success]
+        self.log(f"{action}: {len(report) - len(failed)} of {len(report)} mods succeeded." + (f" Failed: {', '.join(failed)}" if failed else ""))
+        return report
+
+    def __sync_installed_mod(self, mod_id: str) -> bool:
+        """
+        Bring an installed mod in line with its download, using both directories' manifests.
+        The new version is prepared next to the mods directory, and swapped in with a rename once it is complete; the old version is moved back out and deleted in the background.
+        The mod is therefore never missing or half updated, and a failed update leaves the installed version untouched.
+        Only files whose blob SHA differs are taken from the download, and files that are no longer part of the mod are left out. Other files (e.g. settings) are kept.
+        Installations without a manifest (from before manifests existed) are rebuilt from the download completely.
+        :param mod_id: Mod id of the mod to update
+        :return: Whether or not the update was successful.
+        """
+        mod = self.mods.get(mod_id, None)
+        installed_mod = self.installed_mods.get(mod_id, None)
+        if mod is None or mod.downloaded_dir_path in [None, ""] or installed_mod is None:
+            self.log("Could not update installed mod since it wasn't downloaded.")
+            return False
+
+        download_dir = mod.downloaded_dir_path.rstrip("/")
+        install_dir = installed_mod.installed_dir_path.rstrip("/")
+        if os.path.islink(install_dir):
+            self.log(f"Installed mod \"{mod_id}\" is symlinked to its download, nothing to update.")
+            return True
+        source_files = read_manifest(download_dir)
+        installed_files = read_manifest(install_dir)
+
+        staging_dir = self.__install_staging_dir()
+        new_dir = os.path.join(staging_dir, f".{os.path.basename(install_dir)}{NEW_DIRECTORY_MARKER}")
+        install_file = copy2 if self.get_install_strategy() == INSTALL_COPY else self.file_store.link_file
+
+        replaced = 0
+        removed = 0
+        bytes_saved = 0
+        try:
+            if os.path.exists(new_dir):
+                rmtree(new_dir)
+
+            if len(source_files) == 0 or len(installed_files) == 0:
+                self.log(f"No manifest found for mod \"{mod_id}\", reinstalling all of its files.")
+                copytree(download_dir, new_dir, copy_function=install_file)
+                replaced = len(source_files)
+            else:
+                # Hard linking the installed files is cheap, and keeps files that aren't part of the mod.
+                copytree(install_dir, new_dir, copy_function=self.file_store.link_file)
+                for file_name, file in source_files.items():
+                    target_path = os.path.join(new_dir, file_name)
+                    if installed_files.get(file_name, dict()).get("sha", None) == file["sha"] and os.path.exists(target_path):
+                        bytes_saved += file.get("size", 0)
+                        continue
+                    os.makedirs(os.path.dirname(target_path), exist_ok=True)
+                    if os.path.exists(target_path):
+                        os.remove(target_path)
+                    install_file(os.path.join(download_dir, file_name), target_path)
+                    replaced += 1
+
+                for file_name in installed_files:
+                    if file_name not in source_files and os.path.exists(os.path.join(new_dir, file_name)):
+                        os.remove(os.path.join(new_dir, file_name))
+                        removed += 1
+                write_manifest(new_dir, source_files)
+
+            swap_directory(new_dir, install_dir, cleaner=self.cleaner, old_directory=staging_dir)
+        except Exception as e:
+            self.log(f"Updating installed mod failed, keeping the installed version. Exception: {e}", is_error=True)
+            if os.path.exists(new_dir):
+                self.cleaner.schedule(new_dir)
+            return False
+
+        self.log(f"Updated installed mod \"{mod_id}\": {replaced} files replaced, {removed} removed, {bytes_saved} bytes saved by keeping unchanged files.")
+        return True
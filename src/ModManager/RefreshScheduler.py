@@ -0,0 +1,109 @@
+from src.Logger.Loggable import Loggable
+from threading import Thread, Condition, current_thread
+import time
+
+
+REFRESH_DOWNLOADS = "downloads"
+REFRESH_MODS = "mods"
+
+
+class RefreshScheduler(Loggable):
+    """
+    Merges requests to rescan the local mod directories.
+    Operations only mark the directories they changed as dirty. A worker thread waits until no more directories have been marked for a short while, rescans every dirty directory once, and then notifies the listeners once.
+    A burst of operations (e.g. an update that downloads, installs and refreshes, or a whole batch) therefore causes a single rescan per directory.
+    """
+    def __init__(self, logger, refreshers: dict, delay: float = 0.1, max_delay: float = 1.0):
+        """
+        :param logger: Logger to use.
+        :param refreshers: Dictionary of directory name (REFRESH_DOWNLOADS, REFRESH_MODS) to the function that rescans it. Called with force=True when every mod folder should be parsed again.
+        :param delay: Seconds to wait after the last invalidation before rescanning.
+        :param max_delay: Maximum amount of seconds a rescan is delayed by ongoing invalidations.
+        """
+        super(RefreshScheduler, self).__init__(logger=logger)
+        self.refreshers = refreshers
+        self.delay = delay
+        self.max_delay = max_delay
+        self.dirty: set = set()
+        self.forced: set = set()
+        self.first_invalidated = None
+        self.last_invalidated = None
+        self.running = False
+        self.listeners = []
+        self.condition = Condition()
+
+        self.worker = Thread(target=self.__work, name="RefreshScheduler", daemon=True)
+        self.worker.start()
+
+    def add_listener(self, listener) -> None:
+        """
+        Add a function to be called with the set of rescanned directory names after every rescan. Called from the worker thread.
+        :param listener: Function to call.
+        """
+        self.listeners.append(listener)
+
+    def invalidate(self, *names: str, force: bool = False) -> None:
+        """
+        Mark directories as dirty, so they are rescanned shortly.
+        :param names: Names of the directories to rescan.
+        :param force: Whether or not to parse every mod folder in the directories again, rather than only the ones that changed. Used when the user explicitly asks for a refresh.
+        """
+        with self.condition:
+            self.dirty.update(names)
+            if force:
+                self.forced.update(names)
+            self.last_invalidated = time.monotonic()
+            self.first_invalidated = self.first_invalidated or self.last_invalidated
+            self.condition.notify_all()
+
+    def flush(self, timeout: float = None) -> bool:
+        """
+        Rescan the dirty directories right away, and block until no directory is dirty or being rescanned anymore.
+        :param timeout: Maximum amount of seconds to wait. Waits indefinitely if not given.
+        :return: Whether or not all directories are up-to-date.
+        """
+        if current_thread() is self.worker:
+            # Listeners run on the worker, which can't wait for itself.
+            return False
+        with self.condition:
+            if self.dirty:
+                self.first_invalidated = self.last_invalidated = 0.0
+                self.condition.notify_all()
+            return self.condition.wait_for(lambda: len(self.dirty) == 0 and not self.running, timeout)
+
+    def __work(self) -> None:
+        """
+        Worker thread loop. Waits for dirty directories, debounces, and rescans them.
+        """
+        while True:
+            with self.condition:
+                self.condition.wait_for(lambda: len(self.dirty) > 0)
+                while True:
+                    remaining = min(self.last_invalidated + self.delay, self.first_invalidated + self.max_delay) - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self.condition.wait(remaining)
+                names = set(self.dirty)
+                forced = set(self.forced)
+                self.dirty.clear()
+                self.forced.clear()
+                self.first_invalidated = None
+                self.last_invalidated = None
+                self.running = True
+
+            try:
+                for name in sorted(names):
+                    try:
+                        self.refreshers[name](force=name in forced)
+                    except Exception as e:
+                        self.log(f"Could not rescan {name} directory. Exception: {e}", is_error=True)
+                self.log(f"Rescanned local {' & '.join(sorted(names))} directories.", is_verbose=True)
+                for listener in self.listeners:
+                    try:
+                        listener(names)
+                    except Exception as e:
+                        self.log(f"Refresh listener failed. Exception: {e}", is_error=True)
+            finally:
+                with self.condition:
+                    self.running = False
+                    self.condition.notify_all()
@@ -0,0 +1,122 @@
+from src.Network.RequestScheduler import RequestScheduler, PRIORITY_METADATA
+from src.Logger.Loggable import Loggable
+from os.path import exists, join
+from threading import Lock
+from hashlib import sha1
+from os import makedirs, replace
+import json
+
+
+class HttpCache(Loggable):
+    """
+    Persistent on-disk cache of HTTP responses, keyed by URL.
+    The ETag and Last-Modified headers of every response are stored alongside its body, so later requests for the same URL can be made conditional.
+    If the server answers with a 304 (Not Modified), the cached body is reused. Github does not count these towards the rate limit.
+    """
+    def __init__(self, logger, scheduler: RequestScheduler, cache_directory: str = "./data/cache/http/"):
+        """
+        :param logger: Logger to use.
+        :param scheduler: Request scheduler to send requests through.
+        :param cache_directory: Directory to store the cached responses in.
+        """
+        super(HttpCache, self).__init__(logger=logger)
+        self.scheduler = scheduler
+        self.cache_directory = cache_directory
+        self.index_path = join(cache_directory, "index.json")
+        self.index: dict[str, dict] = dict()
+        self.lock = Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+        self.load()
+
+    def load(self) -> None:
+        """
+        Load the cache index from disk.
+        """
+        if not exists(self.index_path):
+            return
+        try:
+            with open(self.index_path, 'r') as index_file:
+                self.index = json.loads(index_file.read())
+        except Exception as e:
+            self.log(f"Could not load HTTP cache index, starting with an empty cache. Exception: {e}", is_error=True)
+            self.index = dict()
+
+    def save(self) -> None:
+        """
+        Save the cache index to disk.
+        Written to a temporary file first, so a crash never leaves a half-written index behind.
+        """
+        with self.lock:
+            try:
+                makedirs(self.cache_directory, exist_ok=True)
+                with open(self.index_path + ".tmp", 'w') as index_file:
+                    index_file.write(json.dumps(self.index))
+                replace(self.index_path + ".tmp", self.index_path)
+            except Exception as e:
+                self.log(f"Could not save HTTP cache index. Exception: {e}", is_error=True)
+
+    def reset_stats(self) -> None:
+        """
+        Reset the hit & miss counters.
+        """
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, url: str, headers: dict = None, content_sha: str = None, priority: int = PRIORITY_METADATA) -> bytes:
+        """
+        Get the body of a URL, using a conditional request if a cached copy exists.
+        :param url: URL to get.
+        :param headers: Additional headers to send with the request.
+        :param content_sha: Known hash of the content behind the URL (for example a git blob SHA). If the cached copy was stored under the same hash, it is returned without making a request at all.
+        :param priority: Priority to schedule the request with, if one is needed.
+        :return: Body of the response, or of the cached copy if the server reported it as unchanged.
+        :raises requests.HTTPError: If the server answered with an error status.
+        """
+        request_headers = dict(headers or {})
+
+        with self.lock:
+            entry = self.index.get(url, None)
+        body_path = join(self.cache_directory, sha1(url.encode("utf-8")).hexdigest())
+
+        conditional = entry is not None and exists(body_path)
+        if conditional and content_sha is not None and entry.get("content_sha") == content_sha:
+            with self.lock:
+                self.hits += 1
+            with open(body_path, 'rb') as body_file:
+                return body_file.read()
+
+        if conditional:
+            if entry.get("etag"):
+                request_headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                request_headers["If-Modified-Since"] = entry["last_modified"]
+
+        response = self.scheduler.get(url, headers=request_headers, priority=priority)
+
+        if response.status_code == 304 and conditional:
+            self.log(f"Not modified, using cached copy of: \"{url}\"", is_verbose=True)
+            with self.lock:
+                self.hits += 1
+                if content_sha is not None:
+                    entry["content_sha"] = content_sha
+            with open(body_path, 'rb') as body_file:
+                return body_file.read()
+
+        response.raise_for_status()
+        with self.lock:
+            self.misses += 1
+
+        etag = response.headers.get("ETag", None)
+        last_modified = response.headers.get("Last-Modified", None)
+        if etag or last_modified or content_sha:
+            makedirs(self.cache_directory, exist_ok=True)
+            with open(body_path + ".tmp", 'wb') as body_file:
+                body_file.write(response.content)
+            replace(body_path + ".tmp", body_path)
+            with self.lock:
+                self.index[url] = {"etag": etag, "last_modified": last_modified, "content_sha": content_sha}
+
+        return response.content
@@ -0,0 +1,72 @@
+from src.Logger.Loggable import Loggable
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import requests
+
+
+class HttpTransport(Loggable):
+    """
+    Shared HTTP transport for all network I/O of the mod manager.
+    Wraps a single requests session, so connections (and their TLS handshakes) are pooled and kept alive between requests.
+    Every request gets a timeout, and failed connections & server errors are retried with exponential backoff.
+    """
+    def __init__(self, logger, timeout: float = 15, retries: int = 3, backoff_factor: float = 0.5, pool_size: int = 8):
+        """
+        :param logger: Logger to use.
+        :param timeout: Seconds to wait for a connection or for data before giving up on a request.
+        :param retries: How often to retry a failed request.
+        :param backoff_factor: Base of the exponential backoff between retries, in seconds.
+        :param pool_size: Maximum amount of connections to keep open per host.
+        """
+        super(HttpTransport, self).__init__(logger=logger)
+        self.timeout = timeout
+
+        retry = Retry(
+            total=retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=[500, 502, 503, 504],
+            allowed_methods=frozenset(["GET", "HEAD"]),
+            raise_on_status=False
+        )
+        self.adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry, pool_block=True)
+
+        self.session = requests.Session()
+        self.session.mount("https://", self.adapter)
+        self.session.mount("http://", self.adapter)
+
+    def get(self, url: str, headers: dict = None, stream: bool = False) -> requests.Response:
+        """
+        Send a GET request over the shared session.
+        :param url: URL to get.
+        :param headers: Additional headers to send with the request.
+        :param stream: Whether or not to stream the response body instead of reading it immediately.
+        :return: The response.
+        """
+        return self.session.get(url, headers=headers, stream=stream, timeout=self.timeout)
+
+    def get_stats(self) -> dict:
+        """
+        Get connection statistics of the transport's connection pools.
+        :return: Dictionary with the amount of requests sent, connections opened, and requests that reused an open connection.
+        """
+        requests_sent = 0
+        connections_opened = 0
+        pools = self.adapter.poolmanager.pools
+        for key in pools.keys():
+            pool = pools.get(key, None)
+            if pool is None:
+                continue
+            requests_sent += pool.num_requests
+            connections_opened += pool.num_connections
+        return {
+            "requests": requests_sent,
+            "connections_opened": connections_opened,
+            "connections_reused": max(requests_sent - connections_opened, 0)
+        }
+
+    def log_stats(self) -> None:
+        """
+        Log the transport's connection statistics.
+        """
+        stats = self.get_stats()
+        self.log(f"HTTP transport: {stats['requests']} requests, {stats['connections_opened']} connections opened, {stats['connections_reused']} reused.")
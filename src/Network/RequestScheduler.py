@@ -0,0 +1,203 @@
+from src.Network.HttpTransport import HttpTransport
+from src.Logger.Loggable import Loggable
+from urllib.parse import urlparse
+from threading import Condition
+from itertools import count
+import requests
+import heapq
+import time
+
+
+PRIORITY_LISTING = 0
+PRIORITY_METADATA = 1
+PRIORITY_DOWNLOAD = 2
+PRIORITY_IMAGE = 3
+
+GITHUB_API_HOST = "api.github.com"
+
+
+class RequestCancelled(Exception):
+    """
+    Raised for requests that were still waiting for their turn when the scheduler's waiting requests were cancelled.
+    """
+    pass
+
+
+class RateLimitExceeded(Exception):
+    """
+    Raised for Github API requests that would have to wait longer than allowed for the rate limit to reset.
+    """
+    pass
+
+
+class RequestScheduler(Loggable):
+    """
+    Schedules requests over the HTTP transport, keeping track of Github's API rate limit.
+    The remaining budget is read from the rate limit headers of every response that passes through the transport.
+    Waiting requests are started in order of priority (listings, then metadata, then downloads, then images).
+    When the budget runs out, API requests pause until the rate limit resets instead of failing.
+    """
+    def __init__(self, logger, transport: HttpTransport, max_concurrent: int = 8, max_wait: float = 900):
+        """
+        :param logger: Logger to use.
+        :param transport: HTTP transport to send requests over.
+        :param max_concurrent: Maximum amount of requests in flight at the same time.
+        :param max_wait: Maximum amount of seconds an API request may wait for the rate limit to reset. Longer waits raise RateLimitExceeded.
+        """
+        super(RequestScheduler, self).__init__(logger=logger)
+        self.transport = transport
+        self.max_concurrent = max(1, max_concurrent)
+        self.max_wait = max_wait
+
+        self.condition = Condition()
+        self.waiting: dict[bool, list] = {True: [], False: []}
+        self.tickets = count()
+        self.in_flight = 0
+        self.cancelled: set[tuple] = set()
+
+        self.remaining = None
+        self.limit = None
+        self.reset_time = None
+        self.average_duration = 0.5
+
+        self.transport.session.hooks["response"].append(self.__observe_response)
+
+    def get(self, url: str, headers: dict = None, stream: bool = False, priority: int = PRIORITY_METADATA) -> requests.Response:
+        """
+        Send a GET request once it is its turn and, for Github API requests, once there is rate limit budget for it.
+        API requests that were rejected because the rate limit ran out are retried after it resets.
+        :param url: URL to get.
+        :param headers: Additional headers to send with the request.
+        :param stream: Whether or not to stream the response body instead of reading it immediately.
+        :param priority: Priority of the request. Lower goes first.
+        :return: The response.
+        :raises RequestCancelled: If cancel_waiting was called for the request's priority while the request was waiting.
+        :raises RateLimitExceeded: If the request would have to wait longer than max_wait.
+        """
+        is_api = urlparse(url).hostname == GITHUB_API_HOST
+        for attempt in range(3):
+            self.__acquire(is_api, priority)
+            started = time.time()
+            try:
+                response = self.transport.get(url, headers=headers, stream=stream)
+            finally:
+                self.__release(time.time() - started)
+            if not (is_api and response.status_code in [403, 429] and self.__is_rate_limit_response(response)):
+                return response
+            self.log(f"Rate limited by Github, waiting for the rate limit to reset before retrying: \"{url}\"")
+        return response
+
+    def cancel_waiting(self, priorities: list[int] = None) -> None:
+        """
+        Cancel requests that are currently waiting for their turn. Requests in flight are not affected.
+        :param priorities: Priorities of the requests to cancel, e.g. only a catalog fetch's listings and metadata. Cancels all waiting requests if not given.
+        """
+        with self.condition:
+            for queue in self.waiting.values():
+                self.cancelled.update(ticket for ticket in queue if priorities is None or ticket[0] in priorities)
+            self.condition.notify_all()
+
+    def get_status(self) -> dict:
+        """
+        Get the scheduler's view of the rate limit and the work still queued.
+        :return: Dictionary with the remaining API budget, the budget's limit, the time (epoch seconds) it resets at, the amount of pending requests, and the estimated time (epoch seconds) at which all of them will have finished.
+        """
+        with self.condition:
+            pending_api = len(self.waiting[True])
+            pending = pending_api + len(self.waiting[False]) + self.in_flight
+            now = time.time()
+            estimated_completion = now + pending * self.average_duration / self.max_concurrent
+            if self.remaining is not None and self.reset_time is not None and pending_api > self.remaining:
+                estimated_completion = max(self.reset_time, now) + (pending - self.remaining) * self.average_duration / self.max_concurrent
+            return {
+                "remaining": self.remaining,
+                "limit": self.limit,
+                "reset_time": self.reset_time,
+                "pending": pending,
+                "estimated_completion": estimated_completion if pending > 0 else None
+            }
+
+    def __budget_wait(self) -> float:
+        """
+        Seconds to wait before the next API request can be sent. Expects the condition's lock to be held.
+        :return: Amount of seconds, 0 if there is budget left.
+        """
+        if self.remaining is None or self.remaining > 0:
+            return 0
+        wait_time = (self.reset_time or 0) - time.time()
+        if wait_time <= 0:
+            # The rate limit has reset; the next response will tell us the new budget.
+            self.remaining = None
+            return 0
+        return wait_time
+
+    def __acquire(self, is_api: bool, priority: int) -> None:
+        """
+        Wait until a request may be sent.
+        :param is_api: Whether or not the request goes to the Github API and uses rate limit budget.
+        :param priority: Priority of the request. Lower goes first.
+        """
+        with self.condition:
+            ticket = (priority, next(self.tickets))
+            queue = self.waiting[is_api]
+            heapq.heappush(queue, ticket)
+            try:
+                while True:
+                    if ticket in self.cancelled:
+                        raise RequestCancelled("Request was cancelled while waiting.")
+                    wait_time = self.__budget_wait() if is_api else 0
+                    if wait_time > self.max_wait:
+                        raise RateLimitExceeded(f"Rate limit exhausted until {time.ctime(self.reset_time)}.")
+                    if queue[0] == ticket and self.in_flight < self.max_concurrent and wait_time <= 0:
+                        break
+                    if wait_time > 0 and queue[0] == ticket:
+                        self.log(f"Github rate limit exhausted, pausing requests until {time.ctime(self.reset_time)}.", is_verbose=True)
+                    self.condition.wait(timeout=wait_time if wait_time > 0 else None)
+            finally:
+                self.cancelled.discard(ticket)
+                queue.remove(ticket)
+                heapq.heapify(queue)
+                self.condition.notify_all()
+
+            self.in_flight += 1
+            if is_api and self.remaining is not None:
+                self.remaining -= 1
+
+    def __release(self, duration: float) -> None:
+        """
+        Mark a request as finished.
+        :param duration: How long the request took, in seconds.
+        """
+        with self.condition:
+            self.in_flight -= 1
+            self.average_duration = self.average_duration * 0.9 + duration * 0.1
+            self.condition.notify_all()
+
+    def __is_rate_limit_response(self, response: requests.Response) -> bool:
+        """
+        Check whether an error response was caused by the rate limit running out.
+        :param response: Response to check.
+        :return: Whether or not the rate limit was the cause.
+        """
+        return response.headers.get("X-RateLimit-Remaining", None) == "0" or "Retry-After" in response.headers
+
+    def __observe_response(self, response: requests.Response, *args, **kwargs) -> None:
+        """
+        Response hook of the transport's session. Updates the rate limit budget from the response's headers.
+        :param response: Response that was received.
+        """
+        headers = response.headers
+        if "X-RateLimit-Remaining" not in headers and "Retry-After" not in headers:
+            return
+        with self.condition:
+            try:
+                if "X-RateLimit-Remaining" in headers:
+                    self.remaining = int(headers["X-RateLimit-Remaining"])
+                    self.limit = int(headers.get("X-RateLimit-Limit", self.limit or 0))
+                    self.reset_time = int(headers.get("X-RateLimit-Reset", self.reset_time or 0))
+                if "Retry-After" in headers and response.status_code in [403, 429]:
+                    self.remaining = 0
+                    self.reset_time = time.time() + int(headers["Retry-After"])
+            except ValueError as e:
+                self.log(f"Could not parse rate limit headers. Exception: {e}", is_error=True)
+            self.condition.notify_all()
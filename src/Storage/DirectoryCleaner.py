@@ -0,0 +1,69 @@
+from src.Logger.Loggable import Loggable
+from os.path import exists, join, isdir
+from threading import Thread
+from shutil import rmtree
+from queue import Queue
+from os import listdir
+import re
+
+
+OLD_DIRECTORY_MARKER = ".old"
+NEW_DIRECTORY_MARKER = ".new"
+TRASH_DIRECTORY = ".modmanager-trash"
+# Names of the directories the manager creates: ".<name>.old-<nanoseconds>" for swapped out versions, ".<name>.new" for new versions being prepared.
+LEFTOVER_DIRECTORY_PATTERN = re.compile(rf"^\..+({re.escape(OLD_DIRECTORY_MARKER)}-\d+|{re.escape(NEW_DIRECTORY_MARKER)})$")
+
+
+class DirectoryCleaner(Loggable):
+    """
+    Deletes directories on a background thread.
+    Directories that were swapped out (old versions of downloaded or installed mods) are handed to the cleaner, so deleting them never delays the swap itself.
+    """
+    def __init__(self, logger):
+        """
+        :param logger: Logger to use.
+        """
+        super(DirectoryCleaner, self).__init__(logger=logger)
+        self.queue = Queue()
+        self.worker = Thread(target=self.__work, name="DirectoryCleaner", daemon=True)
+        self.worker.start()
+
+    def schedule(self, path: str) -> None:
+        """
+        Schedule a directory for deletion.
+        :param path: Directory to delete.
+        """
+        self.queue.put(path)
+
+    def sweep(self, directory: str) -> None:
+        """
+        Schedule the swapped out directories and unfinished new versions that were left behind in a directory (e.g. because the manager was closed before they were deleted).
+        Only directories named exactly the way the manager names them are deleted. Only call this for the manager's own directories.
+        :param directory: Directory to look in.
+        """
+        if directory in [None, ""] or not exists(directory):
+            return
+        for name in listdir(directory):
+            if LEFTOVER_DIRECTORY_PATTERN.match(name) and isdir(join(directory, name)):
+                self.schedule(join(directory, name))
+
+    def wait(self) -> None:
+        """
+        Block until all scheduled directories have been deleted.
+        """
+        self.queue.join()
+
+    def __work(self) -> None:
+        """
+        Worker thread loop. Deletes scheduled directories one by one.
+        """
+        while True:
+            path = self.queue.get()
+            try:
+                if exists(path):
+                    rmtree(path)
+                    self.log(f"Removed old directory: {path}", is_verbose=True)
+            except Exception as e:
+                self.log(f"Could not remove old directory {path}. Exception: {e}", is_error=True)
+            finally:
+                self.queue.task_done()
@@ -0,0 +1,250 @@
+from src.Logger.Loggable import Loggable
+from os.path import join, exists
+from threading import Thread, Event
+import ctypes
+import ctypes.util
+import select
+import struct
+import stat
+import time
+import sys
+import os
+
+
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+WATCH_MASK = IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+INOTIFY_EVENT = struct.Struct("iIII")
+
+DEBOUNCE_SECONDS = 0.25
+MAX_DELAY_SECONDS = 1.0
+POLL_INTERVAL_SECONDS = 1.0
+
+
+class DirectoryWatcher(Loggable):
+    """
+    Watches directories of mod folders (the downloads directory and the game's mods directory) for changes, whoever makes them: the manager itself, the user or another tool.
+    On Linux, changes are picked up through inotify, by watching each directory and every mod folder in it. Elsewhere, the directories are polled every second, which costs two stats per mod folder.
+    Neither looks inside a mod folder's subfolders: a file that is changed there (rather than in the mod folder itself) is only noticed on the next explicit refresh. Polling also misses files other than info.json that are overwritten in place.
+    Bursts of changes are merged, and reported within a second as the names of the mod folders that were added, changed or removed.
+    """
+    def __init__(self, logger, on_change, debounce: float = DEBOUNCE_SECONDS, poll_interval: float = POLL_INTERVAL_SECONDS):
+        """
+        :param logger: Logger to use.
+        :param on_change: Function that is called with (directory, set of changed folder names) from the watcher's thread. The set is None if changes were lost and the whole directory should be rescanned.
+        :param debounce: Seconds to wait for more changes before reporting them.
+        :param poll_interval: Seconds between polls, where inotify isn't available.
+        """
+        super(DirectoryWatcher, self).__init__(logger=logger)
+        self.on_change = on_change
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self.directories: list[str] = []
+        self.stop_event = Event()
+        self.thread = None
+        self.libc = None
+
+    def watch(self, directories: list[str]) -> None:
+        """
+        Start watching directories, replacing the directories that were watched before.
+        Directories that don't exist (yet) are skipped.
+        :param directories: Directories to watch.
+        """
+        self.stop()
+        self.directories = [directory for directory in directories if directory not in [None, ""] and exists(directory)]
+        if len(self.directories) == 0:
+            return
+        self.stop_event = Event()
+        if self.__load_inotify():
+            self.thread = Thread(target=self.__run_inotify, args=(self.directories, self.stop_event), name="DirectoryWatcher", daemon=True)
+        else:
+            self.thread = Thread(target=self.__run_polling, args=(self.directories, self.stop_event), name="DirectoryWatcher", daemon=True)
+        self.thread.start()
+        self.log(f"Watching for changes in: {', '.join(self.directories)}", is_verbose=True)
+
+    def stop(self) -> None:
+        """
+        Stop watching. Blocks until the watcher's thread has stopped.
+        """
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+    def __report(self, changes: dict) -> None:
+        """
+        Report changes to the change handler.
+        :param changes: Dictionary of directory to its changed folder names (or None for a full rescan).
+        """
+        for directory, names in changes.items():
+            try:
+                self.on_change(directory, names)
+            except Exception as e:
+                self.log(f"Could not handle changes in \"{directory}\". Exception: {e}", is_error=True)
+
+    def __load_inotify(self) -> bool:
+        """
+        Load inotify from the C library.
+        :return: Whether or not inotify is available.
+        """
+        if self.libc is not None:
+            return True
+        if not sys.platform.startswith("linux"):
+            return False
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+            libc.inotify_init1.argtypes = [ctypes.c_int]
+            libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+            libc.inotify_rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+        except (OSError, AttributeError) as e:
+            self.log(f"inotify is not available, polling for changes instead. Exception: {e}", is_verbose=True)
+            return False
+        self.libc = libc
+        return True
+
+    def __run_inotify(self, directories: list[str], stop_event: Event) -> None:
+        """
+        Watcher thread loop using inotify.
+        Every directory and every mod folder in it is watched; folders are (un)watched as they appear and disappear. Subfolders of mod folders are not watched.
+        :param directories: Directories to watch.
+        :param stop_event: Event that stops the loop when set.
+        """
+        fd = self.libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            self.log(f"Could not start inotify, polling for changes instead. Error: {os.strerror(ctypes.get_errno())}", is_error=True)
+            self.__run_polling(directories, stop_event)
+            return
+
+        # A watch descriptor can be shared, e.g. by a symlinked installation and its download.
+        watches: dict[int, set] = dict()
+        folder_watches: dict[tuple, int] = dict()
+
+        def add_watch(directory: str, name: str = None) -> None:
+            watch_descriptor = self.libc.inotify_add_watch(fd, os.fsencode(directory if name is None else join(directory, name)), WATCH_MASK | IN_ONLYDIR)
+            if watch_descriptor < 0:
+                return
+            watches.setdefault(watch_descriptor, set()).add((directory, name))
+            if name is not None:
+                folder_watches[(directory, name)] = watch_descriptor
+
+        def remove_watch(directory: str, name: str) -> None:
+            watch_descriptor = folder_watches.pop((directory, name), None)
+            if watch_descriptor is None:
+                return
+            watches.get(watch_descriptor, set()).discard((directory, name))
+            if len(watches.get(watch_descriptor, set())) == 0:
+                watches.pop(watch_descriptor, None)
+                self.libc.inotify_rm_watch(fd, watch_descriptor)
+
+        for directory in directories:
+            add_watch(directory)
+            for name in os.listdir(directory):
+                if not name.startswith("."):
+                    add_watch(directory, name)
+
+        pending: dict[str, set] = dict()
+        first_change = None
+        last_change = None
+        try:
+            while not stop_event.is_set():
+                timeout = 0.5 if last_change is None else max(0.0, min(last_change + self.debounce, first_change + MAX_DELAY_SECONDS) - time.monotonic())
+                readable, _, _ = select.select([fd], [], [], timeout)
+                if readable:
+                    try:
+                        data = os.read(fd, 64 * 1024)
+                    except BlockingIOError:
+                        data = b""
+                    offset = 0
+                    while offset < len(data):
+                        watch_descriptor, mask, _, length = INOTIFY_EVENT.unpack_from(data, offset)
+                        name = os.fsdecode(data[offset + INOTIFY_EVENT.size:offset + INOTIFY_EVENT.size + length].rstrip(b"\0"))
+                        offset += INOTIFY_EVENT.size + length
+
+                        if mask & IN_Q_OVERFLOW:
+                            self.log("Missed filesystem changes, rescanning watched directories.", is_verbose=True)
+                            pending = {directory: None for directory in directories}
+                            first_change = first_change or time.monotonic()
+                            last_change = time.monotonic()
+                            continue
+                        if mask & IN_IGNORED:
+                            for key in watches.pop(watch_descriptor, set()):
+                                if folder_watches.get(key) == watch_descriptor:
+                                    del folder_watches[key]
+                            continue
+
+                        for directory, folder_name in list(watches.get(watch_descriptor, set())):
+                            if folder_name is None:
+                                # Hidden entries are unfinished downloads and swapped out versions.
+                                if name == "" or name.startswith("."):
+                                    continue
+                                if mask & (IN_DELETE | IN_MOVED_FROM):
+                                    remove_watch(directory, name)
+                                if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO):
+                                    add_watch(directory, name)
+                                folder_name = name
+                            if pending.get(directory, set()) is not None:
+                                pending.setdefault(directory, set()).add(folder_name)
+                            first_change = first_change or time.monotonic()
+                            last_change = time.monotonic()
+
+                if last_change is not None and time.monotonic() >= min(last_change + self.debounce, first_change + MAX_DELAY_SECONDS):
+                    self.__report(pending)
+                    pending = dict()
+                    first_change = None
+                    last_change = None
+        except Exception as e:
+            self.log(f"Stopped watching for changes. Exception: {e}", is_error=True)
+        finally:
+            os.close(fd)
+
+    def __run_polling(self, directories: list[str], stop_event: Event) -> None:
+        """
+        Watcher thread loop that polls the directories.
+        Only changes that touch a mod folder's own modification time (files being added, removed or replaced) or its info.json are noticed.
+        :param directories: Directories to watch.
+        :param stop_event: Event that stops the loop when set.
+        """
+        snapshots = {directory: self.__snapshot(directory) for directory in directories}
+        while not stop_event.wait(self.poll_interval):
+            changes = dict()
+            for directory in directories:
+                snapshot = self.__snapshot(directory)
+                changed = set(name for name in set(snapshot) | set(snapshots[directory]) if snapshot.get(name) != snapshots[directory].get(name))
+                snapshots[directory] = snapshot
+                if len(changed) > 0:
+                    changes[directory] = changed
+            self.__report(changes)
+
+    def __snapshot(self, directory: str) -> dict:
+        """
+        Stat the mod folders in a directory, and their info.json files.
+        :param directory: Directory to stat the folders of.
+        :return: Dictionary of folder name to its (modification time, inode, info.json's modification time and size).
+        """
+        snapshot = dict()
+        try:
+            for name in os.listdir(directory):
+                if name.startswith("."):
+                    continue
+                try:
+                    folder_stat = os.stat(join(directory, name))
+                except OSError:
+                    continue
+                if not stat.S_ISDIR(folder_stat.st_mode):
+                    continue
+                try:
+                    info_stat = os.stat(join(directory, name, "info.json"))
+                    snapshot[name] = (folder_stat.st_mtime_ns, folder_stat.st_ino, info_stat.st_mtime_ns, info_stat.st_size)
+                except OSError:
+                    snapshot[name] = (folder_stat.st_mtime_ns, folder_stat.st_ino, None, None)
+        except OSError as e:
+            self.log(f"Could not poll \"{directory}\" for changes. Exception: {e}", is_verbose=True)
+        return snapshot
@@ -0,0 +1,189 @@
+from src.Logger.Loggable import Loggable
+from os.path import exists, join, isdir, samefile
+from os import makedirs, replace, remove, link, listdir, stat
+from shutil import copy2
+from threading import Lock
+from hashlib import sha1
+
+
+HASH_CHUNK_SIZE = 64 * 1024
+
+
+def git_blob_sha_file(path: str) -> str:
+    """
+    Calculate the git blob SHA of a file, without reading it into memory at once.
+    :param path: Path of the file to hash.
+    :return: Hex digest of the blob SHA.
+    """
+    blob_hash = sha1(b"blob " + str(stat(path).st_size).encode("ascii") + b"\0")
+    with open(path, 'rb') as file_to_hash:
+        for chunk in iter(lambda: file_to_hash.read(HASH_CHUNK_SIZE), b""):
+            blob_hash.update(chunk)
+    return blob_hash.hexdigest()
+
+
+class FileStore(Loggable):
+    """
+    Content-addressed on-disk store of mod files.
+    Files are keyed by their git blob SHA, which Github's listings already provide, so no hashing is needed for downloaded files.
+    Downloaded files are hard linked into the store, and installed mods are hard linked from their downloads, so every file is only stored once.
+    Identical files of different mods (or different versions of the same mod) share a single copy as well.
+    Where hard links aren't possible (e.g. across filesystems), files are copied instead.
+    Since stored files share their inode with downloads (and hard linked installations), writing to one of those in place changes the stored file as well.
+    Stored files are therefore verified against their key before they are reused, and dropped from the store if they no longer match. A verified file is only hashed again once its size or modification time changes.
+    Stored files are only linked to new paths while holding the objects lock, which garbage collection takes as well, so a file is never collected between being looked up and being linked.
+    """
+    def __init__(self, logger, store_directory: str = "./data/store/files/"):
+        """
+        :param logger: Logger to use.
+        :param store_directory: Directory to store the files in.
+        """
+        super(FileStore, self).__init__(logger=logger)
+        self.store_directory = store_directory
+        self.verified: dict[tuple, tuple] = dict()
+        self.lock = Lock()
+        self.objects_lock = Lock()
+
+    def object_path(self, key: str) -> str:
+        """
+        Get the path a file is stored at.
+        :param key: Key of the file.
+        :return: Path of the stored file.
+        """
+        return join(self.store_directory, key[:2], key)
+
+    def contains(self, key: str) -> bool:
+        """
+        Check whether a file is stored.
+        :param key: Key of the file.
+        :return: Whether or not the file is in the store.
+        """
+        return key not in [None, ""] and exists(self.object_path(key))
+
+    def verify_file(self, path: str, key: str) -> bool:
+        """
+        Check whether a file's contents still match a key.
+        The file is hashed the first time it is checked, and afterwards only when its size or modification time changed.
+        :param path: Path of the file to check.
+        :param key: Key (git blob SHA) the file should have.
+        :return: Whether or not the file matches the key. False if it doesn't exist.
+        """
+        try:
+            file_stat = stat(path)
+        except OSError:
+            return False
+        identity = (file_stat.st_dev, file_stat.st_ino)
+        version = (file_stat.st_size, file_stat.st_mtime_ns, key)
+        with self.lock:
+            if self.verified.get(identity) == version:
+                return True
+        try:
+            matches = git_blob_sha_file(path) == key
+        except OSError:
+            return False
+        with self.lock:
+            if matches:
+                self.verified[identity] = version
+            else:
+                self.verified.pop(identity, None)
+        return matches
+
+    def get(self, key: str) -> str:
+        """
+        Get the path of a stored file that can be reused, after verifying that its contents still match its key.
+        Stored files that were changed (through a download or installation they are linked to) are removed from the store.
+        The file may be collected as garbage once this returns, unless it is linked elsewhere; use link_stored to reuse it.
+        :param key: Key of the file.
+        :return: Path of the stored file, or None if it isn't stored (anymore).
+        """
+        if not self.contains(key):
+            return None
+        object_path = self.object_path(key)
+        if self.verify_file(object_path, key):
+            return object_path
+        self.log(f"Stored file {key} was changed in place, removing it from the file store.", is_error=True)
+        try:
+            remove(object_path)
+        except OSError as e:
+            self.log(f"Could not remove changed file {key} from the file store. Exception: {e}", is_error=True)
+        return None
+
+    def add(self, path: str, key: str = None) -> str:
+        """
+        Add a file to the store.
+        If the same file is stored already (and still matches its key), the given file is replaced by a link to the stored copy; otherwise the file is linked into the store.
+        :param path: Path of the file to add. Stays in place.
+        :param key: Key of the file. Calculated from the file's contents if not given. Only pass keys that are known to match the file.
+        :return: Key of the file, or None if it couldn't be stored.
+        """
+        key = key or git_blob_sha_file(path)
+        object_path = self.object_path(key)
+        try:
+            with self.objects_lock:
+                if exists(object_path) and samefile(object_path, path):
+                    return key
+                if self.get(key) is not None:
+                    link(object_path, path + ".link")
+                    replace(path + ".link", path)
+                else:
+                    makedirs(join(self.store_directory, key[:2]), exist_ok=True)
+                    link(path, object_path)
+        except OSError as e:
+            self.log(f"Could not link \"{path}\" with the file store, keeping a separate copy. Exception: {e}", is_verbose=True)
+            if exists(path + ".link"):
+                remove(path + ".link")
+            return None
+        return key
+
+    def link_stored(self, key: str, target_path: str) -> bool:
+        """
+        Hard link (or copy) a stored file to a new path, after verifying that its contents still match its key.
+        :param key: Key of the file.
+        :param target_path: Path to create the link at. Must not exist yet.
+        :return: Whether or not the file was stored, and has been linked.
+        """
+        with self.objects_lock:
+            object_path = self.get(key)
+            if object_path is None:
+                return False
+            self.link_file(object_path, target_path)
+            return True
+
+    def link_file(self, source_path: str, target_path: str) -> str:
+        """
+        Hard link a file to a new path, or copy it if it can't be linked.
+        Has the same signature as shutil's copy functions, so it can be passed to copytree.
+        :param source_path: Path of the file to link.
+        :param target_path: Path to create the link at.
+        :return: The target path.
+        """
+        try:
+            link(source_path, target_path)
+        except OSError:
+            copy2(source_path, target_path)
+        return target_path
+
+    def collect_garbage(self) -> int:
+        """
+        Remove stored files that are no longer linked from any download or installation.
+        :return: Amount of files removed.
+        """
+        removed = 0
+        if not exists(self.store_directory):
+            return removed
+        for prefix in listdir(self.store_directory):
+            prefix_path = join(self.store_directory, prefix)
+            if not isdir(prefix_path):
+                continue
+            for key in listdir(prefix_path):
+                object_path = join(prefix_path, key)
+                try:
+                    with self.objects_lock:
+                        if stat(object_path).st_nlink <= 1:
+                            remove(object_path)
+                            removed += 1
+                except Exception as e:
+                    self.log(f"Could not remove unused file {key} from the file store. Exception: {e}", is_error=True)
+        if removed > 0:
+            self.log(f"Removed {removed} unused files from the file store.", is_verbose=True)
+        return removed
@@ -0,0 +1,136 @@
+from src.Logger.Loggable import Loggable
+from os.path import exists, join
+from os import makedirs, replace, remove
+from threading import Lock
+from hashlib import sha1
+import json
+import time
+
+
+def git_blob_sha(data: bytes) -> str:
+    """
+    Calculate the git blob SHA of some data, the same way git (and Github's tree listings) do.
+    :param data: Data to hash.
+    :return: Hex digest of the blob SHA.
+    """
+    return sha1(b"blob " + str(len(data)).encode("ascii") + b"\0" + data).hexdigest()
+
+
+class ImageStore(Loggable):
+    """
+    Content-addressed on-disk store of mod images.
+    Images are keyed by their git blob SHA, so remote images (whose SHA is known from the tree listing) are never downloaded twice, and identical images are only stored once.
+    The store is capped in size; the least recently used images are evicted first.
+    """
+    def __init__(self, logger, store_directory: str = "./data/cache/images/", max_bytes: int = 64 * 1024 * 1024):
+        """
+        :param logger: Logger to use.
+        :param store_directory: Directory to store the images in.
+        :param max_bytes: Maximum total size of the stored images.
+        """
+        super(ImageStore, self).__init__(logger=logger)
+        self.store_directory = store_directory
+        self.index_path = join(store_directory, "index.json")
+        self.max_bytes = max_bytes
+        self.images: dict[str, dict] = dict()
+        self.lock = Lock()
+
+        self.load()
+
+    def load(self) -> None:
+        """
+        Load the store's index from disk.
+        """
+        if not exists(self.index_path):
+            return
+        try:
+            with open(self.index_path, 'r') as index_file:
+                self.images = json.loads(index_file.read())
+        except Exception as e:
+            self.log(f"Could not load image store index, starting with an empty store. Exception: {e}", is_error=True)
+            self.images = dict()
+
+    def save(self) -> None:
+        """
+        Save the store's index to disk.
+        """
+        with self.lock:
+            try:
+                makedirs(self.store_directory, exist_ok=True)
+                with open(self.index_path + ".tmp", 'w') as index_file:
+                    index_file.write(json.dumps(self.images))
+                replace(self.index_path + ".tmp", self.index_path)
+            except Exception as e:
+                self.log(f"Could not save image store index. Exception: {e}", is_error=True)
+
+    def contains(self, key: str) -> bool:
+        """
+        Check whether an image is stored.
+        :param key: Key of the image.
+        :return: Whether or not the image is in the store.
+        """
+        with self.lock:
+            return key in self.images
+
+    def get(self, key: str) -> bytes:
+        """
+        Get a stored image, and mark it as recently used.
+        :param key: Key of the image.
+        :return: The image's bytes, or None if it isn't stored.
+        """
+        if key in [None, ""]:
+            return None
+        with self.lock:
+            if key not in self.images:
+                return None
+            self.images[key]["last_used"] = time.time()
+        try:
+            with open(join(self.store_directory, key), 'rb') as image_file:
+                return image_file.read()
+        except Exception as e:
+            self.log(f"Stored image {key} could not be read. Exception: {e}", is_error=True)
+            with self.lock:
+                self.images.pop(key, None)
+            return None
+
+    def put(self, data: bytes, key: str = None) -> str:
+        """
+        Store an image. Nothing is written if an image with the same key is already stored.
+        :param data: The image's bytes.
+        :param key: Key to store the image under. Defaults to the git blob SHA of the data.
+        :return: Key of the stored image.
+        """
+        key = key or git_blob_sha(data)
+        with self.lock:
+            if key in self.images:
+                self.images[key]["last_used"] = time.time()
+                return key
+
+        makedirs(self.store_directory, exist_ok=True)
+        with open(join(self.store_directory, key + ".tmp"), 'wb') as image_file:
+            image_file.write(data)
+        replace(join(self.store_directory, key + ".tmp"), join(self.store_directory, key))
+
+        with self.lock:
+            self.images[key] = {"size": len(data), "last_used": time.time()}
+            self.__evict(keep=key)
+        return key
+
+    def __evict(self, keep: str = None) -> None:
+        """
+        Evict least recently used images until the store fits within its maximum size.
+        Expects the lock to be held.
+        :param keep: Key of an image that should never be evicted (usually the one that was just stored).
+        """
+        total = sum(image["size"] for image in self.images.values())
+        for key in sorted(self.images, key=lambda image_key: self.images[image_key]["last_used"]):
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            total -= self.images.pop(key)["size"]
+            try:
+                remove(join(self.store_directory, key))
+            except Exception as e:
+                self.log(f"Could not remove evicted image {key}. Exception: {e}", is_error=True)
+            self.log(f"Evicted image {key} from the image store.", is_verbose=True)
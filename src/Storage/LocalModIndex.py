@@ -0,0 +1,237 @@
+from src.Logger.Loggable import Loggable
+from os.path import exists, join, abspath, dirname, basename, normpath
+from os import makedirs, replace, scandir, stat, DirEntry
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from threading import Lock
+import stat as stat_mode
+import json
+
+
+INFO_FILE = "info.json"
+IMAGE_FILES = ["mod.png", "mod.jpg"]
+
+
+class LocalModIndex(Loggable):
+    """
+    Persistent index of the mod folders in local directories (the downloads directory and the game's mods directory).
+    For every mod folder, the folder's version (its modification time and inode, and its info.json's modification time and size) is stored alongside its parsed info.json and its image's name.
+    Scans only read info.json: images and the mod's other files are never opened.
+    A rescan only lists and parses the folders whose version changed, so refreshing an unchanged directory costs two stats per folder.
+    Downloads, installs and updates swap whole folders into place, which always gives the folder a new inode, and an info.json that is overwritten in place (e.g. by extracting a release over the folder) changes its own modification time.
+    Other files that are overwritten in place (without adding or removing files) are not noticed; use invalidate, or a forced scan, for those.
+    """
+    def __init__(self, logger, index_path: str = "./data/cache/local_index.json", max_workers: int = 8):
+        """
+        :param logger: Logger to use.
+        :param index_path: Path to store the index at.
+        :param max_workers: Maximum amount of threads to parse changed folders with.
+        """
+        super(LocalModIndex, self).__init__(logger=logger)
+        self.index_path = index_path
+        self.max_workers = max(1, max_workers)
+        self.directories: dict[str, dict] = dict()
+        self.lock = Lock()
+        self.dirty = False
+
+        self.load()
+
+    def load(self) -> None:
+        """
+        Load the index from disk.
+        """
+        if not exists(self.index_path):
+            return
+        try:
+            with open(self.index_path, 'r') as index_file:
+                self.directories = json.loads(index_file.read())
+        except Exception as e:
+            self.log(f"Could not load local mod index, rescanning all local mods. Exception: {e}", is_error=True)
+            self.directories = dict()
+
+    def save(self) -> None:
+        """
+        Save the index to disk, if it changed since it was last saved.
+        Written to a temporary file first, so a crash never leaves a half-written index behind.
+        """
+        with self.lock:
+            if not self.dirty:
+                return
+            try:
+                makedirs(dirname(self.index_path), exist_ok=True)
+                with open(self.index_path + ".tmp", 'w') as index_file:
+                    index_file.write(json.dumps(self.directories))
+                replace(self.index_path + ".tmp", self.index_path)
+                self.dirty = False
+            except Exception as e:
+                self.log(f"Could not save local mod index. Exception: {e}", is_error=True)
+
+    def invalidate(self, path: str) -> None:
+        """
+        Forget a mod folder, so it is parsed again on the next scan.
+        :param path: Path of the mod folder.
+        """
+        path = normpath(path)
+        directory, name = abspath(dirname(path)), basename(path)
+        with self.lock:
+            if self.directories.get(directory, dict()).pop(name, None) is not None:
+                self.dirty = True
+
+    def scan(self, directory: str, progress=None, force: bool = False) -> list[dict]:
+        """
+        Scan a directory for mod folders, only parsing the folders that changed since the last scan.
+        The directory is listed with os.scandir, so no extra call is needed to tell folders from files, and changed folders are parsed in parallel.
+        Hidden folders (unfinished downloads and swapped out versions) are skipped, and folders that no longer exist are dropped from the index.
+        :param directory: Directory to scan.
+        :param progress: Optional function that is called with (folders done, folders total) while the directory is scanned.
+        :param force: Whether or not to parse every folder again, even the ones whose version didn't change. Used when the user explicitly asks for a refresh.
+        :return: List of entries, one per mod folder, with the folder's "path", its parsed info.json as "data" (None if it has none) and its "image_path" (None if it has no image).
+        """
+        key = abspath(directory)
+        with self.lock:
+            known = self.directories.get(key, dict())
+            current = dict()
+            changed = []
+            with scandir(directory) as directory_entries:
+                for directory_entry in directory_entries:
+                    if directory_entry.name.startswith("."):
+                        continue
+                    version = self.__folder_version(directory_entry.path, directory_entry)
+                    if version is None:
+                        continue
+                    entry = known.get(directory_entry.name)
+                    if not force and self.__is_current(entry, version):
+                        current[directory_entry.name] = entry
+                    else:
+                        changed.append((directory_entry.name, version))
+
+            done = len(current)
+            total = len(current) + len(changed)
+            if progress is not None:
+                progress(done, total)
+            if len(changed) > 0:
+                with ThreadPoolExecutor(max_workers=min(self.max_workers, len(changed)), thread_name_prefix="LocalModIndex") as executor:
+                    futures = {executor.submit(self.__read_folder, join(directory, name), version): name for name, version in changed}
+                    for future in as_completed(futures):
+                        entry = future.result()
+                        if entry is not None:
+                            current[futures[future]] = entry
+                        done += 1
+                        if progress is not None:
+                            progress(done, total)
+
+            if len(changed) > 0 or len(current) != len(known):
+                self.directories[key] = current
+                self.dirty = True
+            entries = [self.__public_entry(directory, name, current[name]) for name in sorted(current)]
+        self.log(f"Scanned {len(entries)} local mods in \"{directory}\", {len(changed)} of which changed.", is_verbose=True)
+        return entries
+
+    def scan_folder(self, directory: str, name: str, force: bool = False) -> dict:
+        """
+        Scan a single mod folder of a directory, parsing it only if it changed since the last scan.
+        :param directory: Directory the folder is in.
+        :param name: Name of the folder.
+        :param force: Whether or not to parse the folder even if its version didn't change, e.g. because a file in it is known to have been edited in place.
+        :return: Entry of the folder, as returned by scan, or None if it no longer exists (or isn't a mod folder).
+        """
+        key = abspath(directory)
+        path = join(directory, name)
+        with self.lock:
+            known = self.directories.setdefault(key, dict())
+            version = self.__folder_version(path) if not name.startswith(".") else None
+            entry = known.get(name)
+            if version is not None and (force or not self.__is_current(entry, version)):
+                entry = self.__read_folder(path, version)
+                if entry is not None:
+                    known[name] = entry
+                    self.dirty = True
+            if version is None or entry is None:
+                if known.pop(name, None) is not None:
+                    self.dirty = True
+                return None
+            return self.__public_entry(directory, name, entry)
+
+    @staticmethod
+    def __folder_version(path: str, directory_entry: DirEntry = None) -> tuple:
+        """
+        Get what identifies the current version of a folder: its modification time and inode, and its info.json's modification time and size.
+        A folder's own modification time only changes when files are added, removed or replaced, so info.json is checked separately.
+        :param path: Path of the folder.
+        :param directory_entry: The folder's entry from os.scandir, if it was listed that way. Saves a stat call on Windows.
+        :return: Tuple of the folder's modification time (in nanoseconds) and inode and info.json's modification time (in nanoseconds) and size (both None if it has none), or None if it isn't a folder.
+        """
+        try:
+            if directory_entry is not None:
+                if not directory_entry.is_dir():
+                    return None
+                folder_stat = directory_entry.stat()
+                # Entries from os.scandir don't carry the inode on Windows.
+                folder_version = (folder_stat.st_mtime_ns, folder_stat.st_ino or directory_entry.inode())
+            else:
+                folder_stat = stat(path)
+                if not stat_mode.S_ISDIR(folder_stat.st_mode):
+                    return None
+                folder_version = (folder_stat.st_mtime_ns, folder_stat.st_ino)
+        except OSError:
+            return None
+        try:
+            info_stat = stat(join(path, INFO_FILE))
+            return folder_version + (info_stat.st_mtime_ns, info_stat.st_size)
+        except OSError:
+            return folder_version + (None, None)
+
+    @staticmethod
+    def __is_current(entry: dict, version: tuple) -> bool:
+        """
+        Check whether an index entry still describes a folder.
+        :param entry: The folder's index entry, or None if it isn't indexed.
+        :param version: The folder's current version, as returned by __folder_version.
+        :return: Whether or not the entry was read from the same version of the folder. Entries of older indexes, which don't store the full version, never are.
+        """
+        return entry is not None and tuple(entry.get("version", ())) == version
+
+    def __read_folder(self, path: str, version: tuple) -> dict:
+        """
+        Parse a folder into an index entry. Safe to call from multiple threads at once.
+        :param path: Path of the folder.
+        :param version: The folder's version, as returned by __folder_version.
+        :return: Index entry of the folder, or None if it could not be read.
+        """
+        try:
+            entry = self.__parse_folder(path)
+        except Exception as e:
+            # Not indexed, so the folder is tried again on the next scan.
+            self.log(f"Could not read local mod \"{path}\". Exception: {e}", is_error=True)
+            return None
+        entry["version"] = list(version)
+        return entry
+
+    @staticmethod
+    def __public_entry(directory: str, name: str, entry: dict) -> dict:
+        """
+        Turn an index entry into the entry that is handed out by scans.
+        :param directory: Directory the folder is in.
+        :param name: Name of the folder.
+        :param entry: The folder's index entry.
+        :return: Copy of the entry, with the folder's path and image path added.
+        """
+        path = join(directory, name)
+        return dict(entry, path=path, image_path=join(path, entry["image"]) if entry["image"] is not None else None)
+
+    def __parse_folder(self, path: str) -> dict:
+        """
+        Read a mod folder's info.json, and find its image.
+        :param path: Path of the mod folder.
+        :return: Index entry of the folder, without its version.
+        """
+        self.log(f"Fetching local mod from: \"{path}\"")
+        entry = {"data": None, "image": None}
+        with scandir(path) as directory_entries:
+            files = {directory_entry.name: directory_entry for directory_entry in directory_entries if directory_entry.is_file()}
+        if INFO_FILE in files:
+            with open(join(path, INFO_FILE), 'r') as info_file:
+                entry["data"] = json.loads(info_file.read())
+        for name in IMAGE_FILES:
+            if name in files:
+                entry["image"] = name
+        return entry
@@ -0,0 +1,124 @@
+from src.ModManager.DependencyGraph import DependencyGraph, parse_mod_reference, version_tuple
+from src.Mod.Mod import Mod
+import unittest
+
+
+def make_mod(mod_id: str, version: str = "1.0.0", requirements: list = None, incompatible: list = None) -> Mod:
+    """
+    Create a mod with only the fields the dependency graph uses.
+    """
+    return Mod(mod_id, mod_id, version=version, requirements=requirements or [], incompatible=incompatible or [])
+
+
+def make_graph(*mods: Mod) -> DependencyGraph:
+    """
+    Create a dependency graph holding the given mods.
+    """
+    graph = DependencyGraph(None)
+    for mod in mods:
+        graph.update(mod)
+    return graph
+
+
+class TestParseModReference(unittest.TestCase):
+    def test_plain_id(self):
+        self.assertEqual(parse_mod_reference("SomeMod"), ("SomeMod", None))
+
+    def test_id_with_minimum_version(self):
+        self.assertEqual(parse_mod_reference("SomeMod-1.2.0"), ("SomeMod", "1.2.0"))
+        self.assertEqual(parse_mod_reference(" SomeMod-2b "), ("SomeMod", "2b"))
+
+    def test_known_id_ending_in_number_is_not_split(self):
+        self.assertEqual(parse_mod_reference("ShipyardExpansion-2", {"ShipyardExpansion-2"}), ("ShipyardExpansion-2", None))
+        self.assertEqual(parse_mod_reference("ShipyardExpansion-2", {"ShipyardExpansion"}), ("ShipyardExpansion", "2"))
+
+    def test_version_tuple(self):
+        self.assertEqual(version_tuple("1.2.10"), (1, 2, 10))
+        self.assertLess(version_tuple("1.2.9"), version_tuple("1.2.10"))
+        self.assertEqual(version_tuple(None), ())
+
+
+class TestResolveOrder(unittest.TestCase):
+    def test_requirements_come_in_earlier_waves(self):
+        graph = make_graph(make_mod("A", requirements=["B", "C"]), make_mod("B", requirements=["C"]), make_mod("C"), make_mod("D", requirements=["C"]))
+        plan = graph.resolve(["A", "D"])
+        self.assertEqual(plan.waves, [["C"], ["B", "D"], ["A"]])
+        self.assertTrue(plan.ok)
+
+    def test_installed_mods_are_left_out(self):
+        graph = make_graph(make_mod("A", requirements=["B"]), make_mod("B", requirements=["C"]), make_mod("C"))
+        plan = graph.resolve(["A"], installed={"B"})
+        self.assertEqual(plan.waves, [["A"]])
+
+    def test_missing_and_outdated_requirements(self):
+        graph = make_graph(make_mod("A", requirements=["Gone", "B-2.0"]), make_mod("B", version="1.5"))
+        plan = graph.resolve(["A", "Unknown"])
+        self.assertEqual(plan.missing, {"Gone": ["A"], "Unknown": []})
+        self.assertEqual(plan.outdated, [("A", "B", "2.0")])
+        self.assertEqual(plan.waves, [["B"], ["A"]])
+
+    def test_requirement_on_id_ending_in_number(self):
+        graph = make_graph(make_mod("A", requirements=["ShipyardExpansion-2"]))
+        graph.update(make_mod("ShipyardExpansion-2"))
+        plan = graph.resolve(["A"])
+        self.assertEqual(plan.waves, [["ShipyardExpansion-2"], ["A"]])
+        self.assertEqual(plan.missing, dict())
+
+        graph.remove("ShipyardExpansion-2")
+        self.assertEqual(graph.resolve(["A"]).missing, {"ShipyardExpansion": ["A"]})
+
+
+class TestResolveCycles(unittest.TestCase):
+    def test_cycle_is_installed_together(self):
+        graph = make_graph(make_mod("X", requirements=["Y"]), make_mod("Y", requirements=["X"]))
+        plan = graph.resolve(["X"])
+        self.assertEqual(plan.waves, [["X", "Y"]])
+        self.assertEqual(plan.cycles, ["X", "Y"])
+
+    def test_ordering_continues_after_cycle(self):
+        graph = make_graph(make_mod("X", requirements=["Y"]), make_mod("Y", requirements=["X"]), make_mod("Q", requirements=["X"]), make_mod("P", requirements=["Q"]))
+        plan = graph.resolve(["P"])
+        self.assertEqual(plan.waves, [["X", "Y"], ["Q"], ["P"]])
+        self.assertEqual(plan.cycles, ["X", "Y"])
+
+    def test_cycle_after_its_requirements(self):
+        graph = make_graph(make_mod("X", requirements=["Y", "Base"]), make_mod("Y", requirements=["X"]), make_mod("Base"))
+        plan = graph.resolve(["X"])
+        self.assertEqual(plan.waves, [["Base"], ["X", "Y"]])
+
+    def test_cycle_depending_on_cycle(self):
+        graph = make_graph(make_mod("A1", requirements=["A2"]), make_mod("A2", requirements=["A1"]),
+                           make_mod("B1", requirements=["B2", "A1"]), make_mod("B2", requirements=["B1"]))
+        plan = graph.resolve(["B1"])
+        self.assertEqual(plan.waves, [["A1", "A2"], ["B1", "B2"]])
+        self.assertEqual(plan.cycles, ["A1", "A2", "B1", "B2"])
+
+    def test_mod_requiring_itself(self):
+        graph = make_graph(make_mod("S", requirements=["S"]), make_mod("T", requirements=["S"]))
+        plan = graph.resolve(["T"])
+        self.assertEqual(plan.waves, [["S"], ["T"]])
+        self.assertEqual(plan.cycles, ["S"])
+
+
+class TestResolveConflicts(unittest.TestCase):
+    def test_conflict_within_plan(self):
+        graph = make_graph(make_mod("A", requirements=["B"]), make_mod("B", incompatible=["C"]), make_mod("C"))
+        plan = graph.resolve(["A", "C"])
+        self.assertEqual(plan.conflicts, [("B", "C")])
+        self.assertFalse(plan.ok)
+
+    def test_conflict_with_installed_mod(self):
+        graph = make_graph(make_mod("A"), make_mod("C", incompatible=["A-1.0"]))
+        plan = graph.resolve(["A"], installed={"C"})
+        self.assertEqual(plan.conflicts, [("A", "C")])
+
+    def test_conflict_declared_by_both_mods_survives_removal_of_one_side(self):
+        graph = make_graph(make_mod("A", incompatible=["B"]), make_mod("B", incompatible=["A"]))
+        graph.update(make_mod("A"))
+        self.assertEqual(graph.resolve(["A", "B"]).conflicts, [("A", "B")])
+        graph.update(make_mod("B"))
+        self.assertTrue(graph.resolve(["A", "B"]).ok)
+
+
+if __name__ == '__main__':
+    unittest.main()